@@ -5,6 +5,7 @@ Processes all station pairs from MAV unique pairs CSV and saves data in organize
 """
 
 import csv
+import logging
 import os
 import sys
 import time
@@ -13,6 +14,7 @@ from datetime import datetime
 from typing import Dict, Optional, Tuple
 from mav_scraper import MAVScraper
 from json_saver import JSONSaver
+from date_utils import format_timestamp
 
 class BulkMAVScraper:
     """Bulk scraper for processing multiple station pairs."""
@@ -21,7 +23,7 @@ class BulkMAVScraper:
         self.csv_path = csv_path
         self.output_dir = output_dir
         self.scraper = MAVScraper(enable_logging=True)
-        self.json_saver = JSONSaver(output_dir)
+        self.json_saver = JSONSaver(output_dir, scraper=self.scraper)
         
         # Statistics
         self.stats = {
@@ -115,7 +117,7 @@ class BulkMAVScraper:
                 print(f"✅ Found {len(routes)} routes")
                 
                 # Save with JSONSaver (automatically goes to date-based directory)
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                timestamp = format_timestamp(datetime.now())
                 filename = f"bulk_{source_station_id}_{dest_station_id}_{timestamp}"
                 
                 result = self.json_saver.scrape_and_save(
@@ -243,6 +245,7 @@ def main():
     parser.add_argument("--test", action="store_true", help="Test mode: process only first 3 pairs")
     
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     
     # Test mode
     if args.test:
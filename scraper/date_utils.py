@@ -2,9 +2,56 @@
 Date utilities for organizing JSON outputs by date (yyyy-mm-dd folders).
 """
 
+import logging
 import os
+import re
+import shutil
+from collections import defaultdict
 from datetime import datetime
-from typing import Tuple
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Filename timestamps: _20250715_223456 preferred, bare _20250715 as fallback
+_TIMESTAMP_RE = re.compile(r'_(\d{8})_\d{6}')
+_DATE_RE = re.compile(r'_(\d{8})')
+
+# Directories this process has already created/verified
+_created_dirs = set()
+
+def ensure_dir(path: str) -> None:
+    """os.makedirs(path, exist_ok=True), skipped for paths already ensured by this process."""
+    if path not in _created_dirs:
+        os.makedirs(path, exist_ok=True)
+        _created_dirs.add(path)
+
+def _copy_and_unlink(old_path: str, new_path: str) -> None:
+    """Cross-filesystem move: copy2 uses os.sendfile on Linux, so data stays in the kernel."""
+    shutil.copy2(old_path, new_path)
+    os.unlink(old_path)
+
+class _PendingMove(NamedTuple):
+    """A file found by organize_existing_files and where it should go."""
+    old_path: str
+    new_path: str
+    new_dir: str
+    date_folder: str
+    filename: str
+
+@lru_cache(maxsize=8)
+def _date_folder(year: int, month: int, day: int) -> str:
+    """yyyy-mm-dd folder name; cached since batch runs hit the same day repeatedly."""
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+@lru_cache(maxsize=8)
+def _date_stamp(year: int, month: int, day: int) -> str:
+    """yyyymmdd prefix used in timestamped filenames."""
+    return f"{year:04d}{month:02d}{day:02d}"
+
+def format_timestamp(date: datetime) -> str:
+    """Format a datetime as yyyymmdd_HHMMSS (same as strftime("%Y%m%d_%H%M%S"))."""
+    return f"{_date_stamp(date.year, date.month, date.day)}_{date.hour:02d}{date.minute:02d}{date.second:02d}"
 
 def get_date_based_output_path(base_output_dir: str, date: datetime = None) -> Tuple[str, str]:
     """
@@ -25,13 +72,13 @@ def get_date_based_output_path(base_output_dir: str, date: datetime = None) -> T
         date = datetime.now()
     
     # Create date folder name in yyyy-mm-dd format
-    date_folder = date.strftime("%Y-%m-%d")
+    date_folder = _date_folder(date.year, date.month, date.day)
     
     # Create full path
     full_path = os.path.join(base_output_dir, date_folder)
     
     # Ensure directory exists
-    os.makedirs(full_path, exist_ok=True)
+    ensure_dir(full_path)
     
     return full_path, date_folder
 
@@ -54,7 +101,7 @@ def get_timestamped_filename(base_name: str, extension: str = "json", date: date
     if date is None:
         date = datetime.now()
     
-    timestamp = date.strftime("%Y%m%d_%H%M%S")
+    timestamp = format_timestamp(date)
     return f"{base_name}_{timestamp}.{extension}"
 
 def organize_existing_files(output_dir: str, dry_run: bool = True) -> None:
@@ -67,90 +114,91 @@ def organize_existing_files(output_dir: str, dry_run: bool = True) -> None:
         dry_run: If True, only shows what would be moved without actually moving files
     """
     if not os.path.exists(output_dir):
-        print(f"❌ Directory not found: {output_dir}")
+        logger.error("Directory not found: %s", output_dir)
         return
     
     files_to_move = []
     
-    # Find JSON files with timestamps
-    for filename in os.listdir(output_dir):
-        if not filename.endswith('.json'):
-            continue
-            
-        filepath = os.path.join(output_dir, filename)
-        if os.path.isdir(filepath):
-            continue
+    # Find JSON files with timestamps (DirEntry caches the file type from readdir)
+    with os.scandir(output_dir) as entries:
+        entries = [entry for entry in entries
+                   if entry.name.endswith('.json') and not entry.is_dir()]
+    
+    for entry in entries:
+        filename = entry.name
+        filepath = entry.path
         
         # Try to extract date from filename
         # Look for patterns like: _20250715_ or _20250715_223456
-        import re
-        timestamp_match = re.search(r'_(\d{8})_\d{6}', filename)
-        if not timestamp_match:
-            timestamp_match = re.search(r'_(\d{8})', filename)
+        timestamp_match = _TIMESTAMP_RE.search(filename) or _DATE_RE.search(filename)
         
         if timestamp_match:
             date_str = timestamp_match.group(1)
             try:
                 # Parse date (YYYYMMDD)
                 file_date = datetime.strptime(date_str, "%Y%m%d")
-                date_folder = file_date.strftime("%Y-%m-%d")
+                date_folder = _date_folder(file_date.year, file_date.month, file_date.day)
                 
                 # Determine new path
                 new_dir = os.path.join(output_dir, date_folder)
                 new_path = os.path.join(new_dir, filename)
                 
-                files_to_move.append({
-                    'old_path': filepath,
-                    'new_path': new_path,
-                    'new_dir': new_dir,
-                    'date_folder': date_folder,
-                    'filename': filename
-                })
+                files_to_move.append(_PendingMove(filepath, new_path, new_dir, date_folder, filename))
             except ValueError:
                 # Invalid date format, skip
                 continue
     
     if not files_to_move:
-        print(f"📂 No files found to organize in {output_dir}")
+        logger.info("No files found to organize in %s", output_dir)
         return
     
-    print(f"📂 Found {len(files_to_move)} files to organize:")
+    logger.info("Found %d files to organize", len(files_to_move))
     
     # Group by date folder
-    by_date = {}
+    by_date = defaultdict(list)
     for item in files_to_move:
-        date_folder = item['date_folder']
-        if date_folder not in by_date:
-            by_date[date_folder] = []
-        by_date[date_folder].append(item)
+        by_date[item.date_folder].append(item)
+    
+    # All candidate files live directly in output_dir, so one stat covers them
+    source_device = None if dry_run else os.stat(output_dir).st_dev
     
     for date_folder, items in sorted(by_date.items()):
-        print(f"\n📅 {date_folder} ({len(items)} files):")
-        
-        if not dry_run:
+        if dry_run:
+            logger.info("Would move %d files to %s", len(items), date_folder)
+        else:
             # Create directory
-            os.makedirs(items[0]['new_dir'], exist_ok=True)
+            os.makedirs(items[0].new_dir, exist_ok=True)
+            # Atomic rename when the date folder is on the same filesystem;
+            # on a separate mount go straight to copy-and-delete instead of
+            # letting every file fail a rename with EXDEV first
+            same_device = os.stat(items[0].new_dir).st_dev == source_device
+            move = os.replace if same_device else _copy_and_unlink
         
+        moved = 0
         for item in items:
             if dry_run:
-                print(f"   📄 {item['filename']} → {date_folder}/{item['filename']}")
+                # A dry run exists to show the plan, so list every move at INFO
+                logger.info("  %s → %s/%s", item.filename, date_folder, item.filename)
             else:
                 try:
                     # Move file
-                    os.rename(item['old_path'], item['new_path'])
-                    print(f"   ✅ Moved {item['filename']} → {date_folder}/{item['filename']}")
+                    move(item.old_path, item.new_path)
+                    moved += 1
                 except Exception as e:
-                    print(f"   ❌ Failed to move {item['filename']}: {e}")
+                    logger.warning("Failed to move %s: %s", item.filename, e)
+        
+        if not dry_run:
+            logger.info("Moved %d files to %s", moved, date_folder)
     
     if dry_run:
-        print(f"\n💡 This was a dry run. To actually move files, run:")
-        print(f"   from date_utils import organize_existing_files")
-        print(f"   organize_existing_files('{output_dir}', dry_run=False)")
+        logger.info("This was a dry run. To actually move files, run: "
+                    "organize_existing_files('%s', dry_run=False)", output_dir)
     else:
-        print(f"\n✅ File organization complete!")
+        logger.info("File organization complete!")
 
 if __name__ == "__main__":
     # Demo usage
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     base_dir = "json_output"
     date_path, date_folder = get_date_based_output_path(base_dir)
     print(f"📂 Date-based path: {date_path}")
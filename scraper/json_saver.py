@@ -2,17 +2,23 @@
 JSON Saver for MÁV scraper - automatically saves data as JSON files
 """
 
-import json
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from mav_scraper import MAVScraper
-from date_utils import get_date_based_output_path, get_timestamped_filename
+from date_utils import get_date_based_output_path, get_timestamped_filename, format_timestamp
+from json_utils import write_json
+
+logger = logging.getLogger(__name__)
 
 class JSONSaver:
     """Scrapes MÁV data and automatically saves as JSON files."""
     
-    def __init__(self, output_dir: str = "json_output"):
-        self.scraper = MAVScraper()
+    def __init__(self, output_dir: str = "json_output", scraper: MAVScraper = None):
+        # Reuse the caller's scraper when given; batch_save workers also use it,
+        # so all requests share one session, response cache and rate limit
+        self.scraper = scraper if scraper is not None else MAVScraper()
         self.base_output_dir = output_dir
         # Create base directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
@@ -32,10 +38,10 @@ class JSONSaver:
         Returns:
             Dict with file paths and success status
         """
-        print(f"🚆 Scraping {start_station} → {end_station}...")
+        logger.info("Scraping %s → %s...", start_station, end_station)
         
-        # Get JSON data
-        json_data = self.scraper.scrape_to_json(start_station, end_station, travel_date, start_time)
+        # Scrape once; both file variants are serialized from the same result
+        data = self.scraper.scrape_to_dict(start_station, end_station, travel_date, start_time)
         
         # Get date-based output directory
         current_time = datetime.now()
@@ -47,28 +53,23 @@ class JSONSaver:
             filename = get_timestamped_filename(base_name, "json", current_time).replace(".json", "")
         
         # Save pretty JSON
-        pretty_file = os.path.join(output_dir, f"{filename}.json")
-        with open(pretty_file, 'w', encoding='utf-8') as f:
-            f.write(json_data)
+        base_path = f"{output_dir}{os.sep}{filename}"
+        pretty_file = f"{base_path}.json"
+        write_json(pretty_file, data, pretty=True)
         
         # Save compact JSON for APIs
-        compact_data = self.scraper.scrape_to_json(start_station, end_station, travel_date, start_time, pretty=False)
-        compact_file = os.path.join(output_dir, f"{filename}_compact.json")
-        with open(compact_file, 'w', encoding='utf-8') as f:
-            f.write(compact_data)
-        
-        # Parse data to get summary
-        data = json.loads(json_data)
+        compact_file = f"{base_path}_compact.json"
+        write_json(compact_file, data)
         
-        print(f"✅ Saved JSON files to {date_folder}/:")
-        print(f"   📄 Pretty: {pretty_file}")
-        print(f"   📦 Compact: {compact_file}")
+        logger.info("Saved JSON files to %s/", date_folder)
+        logger.debug("Pretty: %s, compact: %s", pretty_file, compact_file)
         
-        if data['success']:
-            print(f"📊 Data summary:")
-            print(f"   🚂 Routes found: {data['total_routes']}")
-            print(f"   💰 Price range: {self._get_price_range(data['routes'])} HUF")
-            print(f"   ⏱️ Fastest: {self._get_fastest_route(data['routes'])}")
+        if data['success'] and logger.isEnabledFor(logging.INFO):
+            min_price, max_price, fastest = self._summarize(data['routes'])
+            logger.info("Routes found: %d, price range: %s HUF, fastest: %s",
+                        data['total_routes'],
+                        f"{min_price:,} - {max_price:,}" if min_price is not None else "N/A",
+                        f"{fastest['travel_time_min']} ({fastest['train_name']})" if fastest else "N/A")
         
         return {
             'success': data['success'],
@@ -77,52 +78,74 @@ class JSONSaver:
             'routes_count': data.get('total_routes', 0)
         }
     
-    def _get_price_range(self, routes):
-        """Get price range from routes."""
-        prices = [r['price_huf'] for r in routes if r.get('price_huf')]
-        if prices:
-            return f"{min(prices):,} - {max(prices):,}"
-        return "N/A"
-    
-    def _get_fastest_route(self, routes):
-        """Get fastest route info."""
-        if routes:
-            fastest = min(routes, key=lambda x: x['travel_time_min'])
-            return f"{fastest['travel_time_min']} ({fastest['train_name']})"
-        return "N/A"
+    def _summarize(self, routes):
+        """
+        Summarize routes in a single pass.
+        
+        Returns:
+            Tuple of (min_price, max_price, fastest_route); prices are None when
+            no route has a price, fastest_route is None when no route has a
+            usable travel time
+        """
+        min_price = max_price = None
+        fastest = fastest_minutes = None
+        for route in routes:
+            price = route.get('price_huf')
+            if price:
+                if min_price is None or price < min_price:
+                    min_price = price
+                if max_price is None or price > max_price:
+                    max_price = price
+            # travel_time_min mixes "H:MM" strings and ints, so compare minutes
+            minutes = MAVScraper.travel_minutes(route['travel_time_min'])
+            if minutes and (fastest is None or minutes < fastest_minutes):
+                fastest, fastest_minutes = route, minutes
+        return min_price, max_price, fastest
     
-    def batch_save(self, routes_list, base_filename: str = None):
+    def batch_save(self, routes_list, base_filename: str = None, max_workers: int = 8):
         """
         Save multiple routes to JSON files.
         
         Args:
             routes_list: List of (start_station, end_station, description) tuples
             base_filename: Optional base filename
+            max_workers: Number of routes fetched concurrently
             
         Returns:
-            List of results for each route
+            List of results for each route, in input order
         """
-        results = []
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = format_timestamp(datetime.now())
         
+        jobs = []
         for i, (start, end, description) in enumerate(routes_list):
-            print(f"\n🔄 Processing route {i+1}/{len(routes_list)}: {description}")
-            
             if base_filename:
                 filename = f"{base_filename}_{i+1}_{timestamp}"
             else:
                 safe_desc = description.replace(" ", "_").replace("→", "to").replace("-", "_")
                 filename = f"{safe_desc}_{timestamp}"
+            jobs.append((start, end, description, filename))
+        
+        results = [None] * len(jobs)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.scrape_and_save, start, end,
+                                start_time="01:00", filename=filename): i
+                for i, (start, end, _, filename) in enumerate(jobs)
+            }
             
-            result = self.scrape_and_save(start, end, start_time="01:00", filename=filename)
-            result['description'] = description
-            results.append(result)
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                result = future.result()
+                result['description'] = jobs[i][2]
+                results[i] = result
+                logger.info("Processed route %d/%d: %s", done, len(jobs), jobs[i][2])
         
-        print(f"\n✅ Batch processing completed! Saved {len(results)} route files.")
+        logger.info("Batch processing completed! Saved %d route files.", len(results))
         return results
 
 def main():
     """Example usage of JSON saver."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     saver = JSONSaver()
     
     # Example 1: Single route
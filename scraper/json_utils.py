@@ -0,0 +1,76 @@
+"""
+JSON helpers for the scraper - uses orjson when available, stdlib json otherwise.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Large output buffer: multi-MB raw API dumps go out in a few syscalls
+_WRITE_BUFFER_SIZE = 1 << 20
+
+def _default(obj: Any) -> Any:
+    """Serialize datetimes like orjson does (ISO 8601)."""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+# Reused for every fallback encode; compact output matches orjson's (no spaces)
+_PRETTY_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2, default=_default)
+_COMPACT_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=_default)
+
+def dumps_bytes(data: Any, pretty: bool = False) -> bytes:
+    """
+    Serialize data to UTF-8 encoded JSON bytes.
+
+    Args:
+        data: JSON-serializable object
+        pretty: If True, indent with 2 spaces
+
+    Returns:
+        UTF-8 encoded JSON, ready for a binary-mode write
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+
+    encoder = _PRETTY_ENCODER if pretty else _COMPACT_ENCODER
+    return encoder.encode(data).encode('utf-8')
+
+def loads(data) -> Any:
+    """Parse JSON from str or bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def write_json(path: str, data: Any, pretty: bool = False) -> None:
+    """
+    Write data to path as UTF-8 JSON.
+
+    Only the orjson path encodes the whole document up front and writes it
+    in one call. The stdlib fallback never builds the full string: it writes
+    the chunks from iterencode as they are produced, and the write buffer
+    batches them into large writes.
+
+    Args:
+        path: Output file path
+        data: JSON-serializable object
+        pretty: If True, indent with 2 spaces
+    """
+    if ORJSON_AVAILABLE:
+        with open(path, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(dumps_bytes(data, pretty))
+        return
+
+    encoder = _PRETTY_ENCODER if pretty else _COMPACT_ENCODER
+    with open(path, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+        for chunk in encoder.iterencode(data):
+            f.write(chunk)
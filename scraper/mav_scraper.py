@@ -4,14 +4,27 @@ A clean, modular scraper for fetching MÁV train data and analyzing delays.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import atexit
 import json
+import logging
+import queue
 import random
 import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import os
 import sys
 
+from date_utils import ensure_dir, format_timestamp
+from json_utils import dumps_bytes, write_json, loads as json_loads
+
 # Add logging directory to path for import
 if 'logging' not in sys.path:
     sys.path.append('logging')
@@ -22,23 +35,269 @@ except ImportError:
     # Fallback if import fails
     MAVCallLogger = None
 
+# urllib3 only decodes "br" responses when a Brotli binding is installed;
+# don't advertise it otherwise
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+ACCEPT_ENCODING = "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate"
+
+logger = logging.getLogger(__name__)
+
+# Browser-like request headers sent alongside the rotating User-Agent
+_BASE_HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.9,hu;q=0.8",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Content-Type": "application/json; charset=utf-8",
+    "Origin": "https://jegy.mav.hu",
+    "Referer": "https://jegy.mav.hu/",
+    "DNT": "1",
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-site",
+    "Sec-Ch-Ua": '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
+    "Sec-Ch-Ua-Mobile": "?0",
+    "Sec-Ch-Ua-Platform": '"Windows"',
+    "UserSessionId": "''"
+}
+
+# Constant parts of the offer request payload; create_payload copies this and
+# fills in the per-request fields (key order matches what the API was captured with).
+# The nested values are shared between payloads, so treat them as read-only.
+_DEFAULT_PASSENGER = {
+    "passengerCount": 1,
+    "passengerId": 0,
+    "customerTypeKey": "HU_44_025-065",
+    "customerDiscountsKeys": []
+}
+
+_PAYLOAD_TEMPLATE = {
+    "offerkind": "1",
+    "startStationCode": None,
+    "innerStationsCodes": [],
+    "endStationCode": None,
+    "modalities": [100, 200, 109],  # From your working example
+    "passangers": None,
+    "isOneWayTicket": True,
+    "isTravelEndTime": False,
+    "isSupplementaryTicketsOnly": False,
+    "hasHungaryPass": False,
+    "travelStartDate": None,
+    "travelReturnDate": None,
+    "selectedServices": [52],  # From your working example
+    "selectedSearchServices": ["BUDAPESTI_HELYI_KOZLEKEDESSEL"],  # From your example
+    "eszkozSzamok": [],
+    "isOfDetailedSearch": False,
+    "isFromTimeTable": False
+}
+
+# Shared read-only default for dict.get() lookups in the parsers, so a missing
+# key does not allocate a fresh {} each time
+_EMPTY = {}
+
+# Canonical payload encoding used as the response-cache key
+_cache_key = json.JSONEncoder(sort_keys=True).encode
+
+# Placeholder the API sends for "no time recorded"
+_ZERO_TS = "0001-01-01T00:00:00+01:00"
+
+# Preformatted "H:MM" strings for segment travel times up to 12 hours
+_TRAVEL_TIME_STRINGS = tuple(f"{m // 60}:{m % 60:02d}" for m in range(721))
+
+def _parse_ts(value: str) -> Optional[datetime]:
+    """Parse an API timestamp; None for empty, placeholder or malformed values."""
+    if not value or value == _ZERO_TS:
+        return None
+    try:
+        # fromisoformat only accepts a trailing 'Z' from Python 3.11 on
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+def _minutes(delta: timedelta) -> int:
+    """Whole minutes in delta, truncated toward zero like int(delta.total_seconds() / 60)."""
+    if delta.days < 0:
+        return -_minutes(-delta)
+    return delta.days * 1440 + delta.seconds // 60
+
+def _delay_minutes(actual: Optional[datetime], scheduled: Optional[datetime]) -> int:
+    """Whole minutes actual is behind scheduled; 0 when either is missing."""
+    if actual is None or scheduled is None:
+        return 0
+    try:
+        return _minutes(actual - scheduled)
+    except TypeError:
+        # naive vs aware timestamps
+        return 0
+
+@lru_cache(maxsize=1024)
+def _format_travel_time(travel_time) -> str:
+    """Cached body of MAVScraper.format_travel_time; the same few minute values recur across routes."""
+    if not travel_time:
+        return "Unknown"
+
+    # If it's already in HH:MM format, return it
+    if isinstance(travel_time, str) and ":" in travel_time:
+        return travel_time
+
+    # If it's a number (minutes), convert to HH:MM
+    try:
+        minutes_int = int(travel_time)
+        if minutes_int == 0:
+            return "Unknown"
+        hours = minutes_int // 60
+        mins = minutes_int % 60
+        return f"{hours:02d}:{mins:02d}"
+    except (ValueError, TypeError):
+        return "Unknown"
+
+# (output key, segment key, default) for each field of a simplified train leg
+_LEG_KEY_MAP = (
+    ("leg_number", 'leg_number', 1),
+    ("train", 'train_full_name', 'Unknown'),
+    ("from_station", 'start_station', 'Unknown'),
+    ("to_station", 'end_station', 'Unknown'),
+    ("scheduled_departure", 'departure_scheduled', 'Unknown'),
+    ("actual_departure", 'departure_actual', 'Unknown'),
+    ("departure_delay_min", 'departure_delay', 0),
+    ("scheduled_arrival", 'arrival_scheduled', 'Unknown'),
+    ("actual_arrival", 'arrival_actual', 'Unknown'),
+    ("arrival_delay_min", 'arrival_delay', 0),
+    ("travel_time", 'travel_time', 'Unknown'),
+)
+
+def _make_leg(segment: Dict) -> Dict:
+    """Simplified view of one train leg, as used in create_simplified_output."""
+    get = segment.get
+    leg = {out_key: get(key, default) for out_key, key, default in _LEG_KEY_MAP}
+    # Mutable default, so not part of the static map
+    leg["services"] = get('services', [])
+    return leg
+
+class TokenBucket:
+    """Thread-safe token bucket: allows bursts up to capacity, then rate requests per second."""
+    
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1 token, got {capacity}")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping only as long as needed for it to refill."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+# Process-wide buckets by rate: every MAVScraper with the same rate_per_sec draws
+# from one bucket, so extra scraper instances don't multiply the API request rate
+_shared_buckets = {}
+_shared_buckets_lock = threading.Lock()
+
+def _shared_bucket(rate_per_sec: float) -> TokenBucket:
+    """The process-wide TokenBucket for rate_per_sec, created on first use."""
+    with _shared_buckets_lock:
+        bucket = _shared_buckets.get(rate_per_sec)
+        if bucket is None:
+            # Capacity below one token would never allow a request
+            bucket = _shared_buckets[rate_per_sec] = TokenBucket(
+                rate=rate_per_sec, capacity=max(1.0, rate_per_sec * 2))
+        return bucket
+
+# One call-log queue and writer thread for the whole process: entries are
+# (call_logger, kwargs) pairs so every scraper's log goes through the same worker.
+# At exit the worker gets a stop sentinel and is given a bounded time to drain.
+_LOG_STOP = object()
+_LOG_FLUSH_TIMEOUT = 5.0
+_log_queue = queue.Queue(maxsize=10000)
+_log_thread = None
+_log_thread_lock = threading.Lock()
+
+def _log_worker():
+    """Write queued API call entries until the stop sentinel (background thread)."""
+    while True:
+        item = _log_queue.get()
+        if item is _LOG_STOP:
+            return
+        call_logger, entry = item
+        try:
+            call_logger.log_api_call(**entry)
+        except Exception as e:
+            logger.warning("Failed to write API call log entry: %s", e)
+
+def _stop_log_worker():
+    """Flush pending call-log entries at exit, waiting at most _LOG_FLUSH_TIMEOUT."""
+    try:
+        _log_queue.put(_LOG_STOP, timeout=_LOG_FLUSH_TIMEOUT)
+    except queue.Full:
+        logger.warning("API call log queue still full at exit, dropping pending entries")
+        return
+    _log_thread.join(_LOG_FLUSH_TIMEOUT)
+    if _log_thread.is_alive():
+        logger.warning("API call log writer did not finish within %.0fs", _LOG_FLUSH_TIMEOUT)
+
+def _ensure_log_worker():
+    """Start the shared call-log writer thread on first use."""
+    global _log_thread
+    with _log_thread_lock:
+        if _log_thread is None:
+            _log_thread = threading.Thread(target=_log_worker, name="mav-call-logger", daemon=True)
+            _log_thread.start()
+            atexit.register(_stop_log_worker)
 
 class MAVScraper:
     """
     A clean interface to the MÁV API for fetching train route data and delay information.
     """
     
-    def __init__(self, enable_logging: bool = True, log_file: str = None):
+    # Default concurrency for fetch_routes_many
+    DEFAULT_MAX_WORKERS = 8
+    
+    # Upper bound on cached route responses
+    CACHE_MAX_ENTRIES = 512
+    
+    # Content-Encoding is reported once per process
+    _encoding_logged = False
+    
+    def __init__(self, enable_logging: bool = True, log_file: str = None, cache_ttl: float = 60,
+                 rate_per_sec: float = 1.0, bucket: Optional[TokenBucket] = None):
         self.base_url = "https://jegy-a.mav.hu/IK_API_PROD/api/OfferRequestApi/GetOfferRequest"
         
         # Create a session for cookie persistence and connection reuse
         self.session = requests.Session()
         
-        # Set aggressive timeouts at session level
-        # # Remove socket_options argument for compatibility with older requests versions
-        # adapter = requests.adapters.HTTPAdapter()
-        # self.session.mount("https://", adapter)
-        # self.session.mount("http://", adapter)
+        # Keep-alive pool large enough that fetch_routes_many bursts never discard
+        # connections (and pay a new TLS handshake); connection errors and 429/5xx
+        # responses are retried with backoff. The offer search is read-only, so
+        # retrying POST is safe. read=0: a request that times out reading is not
+        # re-sent, so a hanging pair still fails after one read timeout.
+        # raise_on_status=False hands the final error response back to fetch_routes.
+        retries = Retry(total=3, read=0, backoff_factor=0.5,
+                        status_forcelist=[429, 500, 502, 503, 504],
+                        allowed_methods=["POST"], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         
         # Set realistic browser headers to mask the request
         self.user_agents = [
@@ -49,11 +308,40 @@ class MAVScraper:
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
         ]
         
+        # One complete header set per User-Agent, built once; rotation just picks one
+        self._header_variants = [{"User-Agent": user_agent, **_BASE_HEADERS} for user_agent in self.user_agents]
+        
         # Set realistic headers that rotate
         self._update_headers()
         
-        # Set reasonable timeout for MAV API requests (fail fast if hanging)
+        # Set reasonable timeout for MAV API requests (fail fast if hanging).
+        # Connects get a short timeout of their own since the adapter retries them.
         self.timeout = 180
+        self.connect_timeout = 10
+        
+        # API request rate limit: an explicitly passed bucket, else the process-wide
+        # one for rate_per_sec (shared by all scrapers and fetch_routes_many workers);
+        # rate_per_sec=0 disables throttling. Only the first attempt of each request
+        # takes a token - the adapter's own connect/429/5xx retries are not throttled
+        # here, they are paced by the Retry backoff instead.
+        if bucket is None and rate_per_sec < 0:
+            raise ValueError(f"rate_per_sec must be >= 0, got {rate_per_sec}")
+        self.rate_per_sec = rate_per_sec
+        if bucket is not None:
+            self._bucket = bucket
+        elif rate_per_sec > 0:
+            self._bucket = _shared_bucket(rate_per_sec)
+        else:
+            self._bucket = None
+        
+        # LRU cache of successful response bodies keyed by payload; 0 disables it
+        self.cache_ttl = cache_ttl
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Futures for requests currently on the wire, keyed like the cache
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
         
         # Initialize logging
         self.enable_logging = enable_logging and MAVCallLogger is not None
@@ -61,35 +349,15 @@ class MAVScraper:
             self.logger = MAVCallLogger(log_file)
         else:
             self.logger = None
+        
+        # Call-log writes go through the shared queue and writer thread so
+        # fetches never wait on disk
+        if self.logger is not None:
+            _ensure_log_worker()
     
     def _update_headers(self):
         """Update session headers with realistic browser headers."""
-        user_agent = random.choice(self.user_agents)
-        
-        self.session.headers.update({
-            "User-Agent": user_agent,
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "en-US,en;q=0.9,hu;q=0.8",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Content-Type": "application/json; charset=utf-8",
-            "Origin": "https://jegy.mav.hu",
-            "Referer": "https://jegy.mav.hu/",
-            "DNT": "1",
-            "Connection": "keep-alive",
-            "Sec-Fetch-Dest": "empty",
-            "Sec-Fetch-Mode": "cors",
-            "Sec-Fetch-Site": "same-site",
-            "Sec-Ch-Ua": '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
-            "Sec-Ch-Ua-Mobile": "?0",
-            "Sec-Ch-Ua-Platform": '"Windows"',
-            "UserSessionId": "''"
-        })
-    
-    def _add_random_delay(self, min_seconds: float = 0.5, max_seconds: float = 2.0):
-        """Add a small random delay to mimic human behavior."""
-        import time
-        delay = random.uniform(min_seconds, max_seconds)
-        time.sleep(delay)
+        self.session.headers.update(random.choice(self._header_variants))
     
     def create_payload(self, 
                       start_station: str, 
@@ -125,30 +393,16 @@ class MAVScraper:
             
             travel_date = travel_datetime.strftime("%Y-%m-%dT%H:%M:%S+02:00")
             
-        return {
-            "offerkind": "1",
-            "startStationCode": start_station,
-            "innerStationsCodes": [],
-            "endStationCode": end_station,
-            "modalities": [100, 200, 109],  # From your working example
-            "passangers": [{
-                "passengerCount": passenger_count,
-                "passengerId": 0,
-                "customerTypeKey": "HU_44_025-065",
-                "customerDiscountsKeys": []
-            }],
-            "isOneWayTicket": True,
-            "isTravelEndTime": False,
-            "isSupplementaryTicketsOnly": False,
-            "hasHungaryPass": False,
-            "travelStartDate": travel_date,
-            "travelReturnDate": travel_date,  # Adding this from your example
-            "selectedServices": [52],  # From your working example
-            "selectedSearchServices": ["BUDAPESTI_HELYI_KOZLEKEDESSEL"],  # From your example
-            "eszkozSzamok": [],
-            "isOfDetailedSearch": False,
-            "isFromTimeTable": False
-        }
+        payload = _PAYLOAD_TEMPLATE.copy()
+        payload["startStationCode"] = start_station
+        payload["endStationCode"] = end_station
+        payload["passangers"] = [
+            _DEFAULT_PASSENGER if passenger_count == 1
+            else dict(_DEFAULT_PASSENGER, passengerCount=passenger_count)
+        ]
+        payload["travelStartDate"] = travel_date
+        payload["travelReturnDate"] = travel_date  # Adding this from your example
+        return payload
     
     def fetch_routes(self, start_station: str, end_station: str, 
                     travel_date: Optional[str] = None,
@@ -167,10 +421,54 @@ class MAVScraper:
             end_station_name: Human-readable end station name for logging
             
         Returns:
-            Tuple of (success, data) where success is bool and data is the API response
+            Tuple of (success, data) where success is bool and data is the API response.
+            data is always a fresh dict owned by the caller. Cache hits and
+            calls coalesced onto an in-flight request are not written to the
+            API call log; only the request that reached the API is.
         """
         payload = self.create_payload(start_station, end_station, travel_date, start_time)
         
+        # Dashboards re-poll the same pairs; serve recent identical queries from memory.
+        # The cache holds the raw response body, so each hit decodes its own copy
+        cache_key = _cache_key(payload)
+        if self.cache_ttl > 0:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                logger.debug("Cache hit for %s → %s", start_station, end_station)
+                return True, json_loads(cached)
+        
+        # Concurrent identical queries share a single API call: the first caller
+        # issues it, later ones wait on its Future and decode the body it carries
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            is_owner = future is None
+            if is_owner:
+                future = self._inflight[cache_key] = Future()
+        
+        if not is_owner:
+            logger.debug("Waiting on in-flight request for %s → %s", start_station, end_station)
+            body = future.result()
+            return (True, json_loads(body)) if body is not None else (False, {})
+        
+        try:
+            success, data, body = self._request_routes(payload, start_station, end_station,
+                                                       travel_date, start_time,
+                                                       start_station_name, end_station_name)
+            if success and self.cache_ttl > 0:
+                self._cache_put(cache_key, body)
+            future.set_result(body if success else None)
+            return success, data
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[cache_key]
+    
+    def _request_routes(self, payload: Dict, start_station: str, end_station: str,
+                        travel_date: Optional[str], start_time: Optional[str],
+                        start_station_name: str, end_station_name: str) -> Tuple[bool, Dict, Optional[bytes]]:
+        """Issue one API request for payload and log it; returns (success, data, body bytes)."""
         # Record start time for logging
         call_start_time = datetime.now()
         success = False
@@ -180,28 +478,42 @@ class MAVScraper:
         response_data = None
         
         try:
-            print(f"🚆 Fetching routes from {start_station} to {end_station}...")
+            logger.info("Fetching routes from %s to %s", start_station, end_station)
             
             # Occasionally update headers to rotate User-Agent
             if random.random() < 0.1:  # 10% chance to update headers
                 self._update_headers()
             
-            self._add_random_delay()  # Add a small delay before request
+            if self._bucket is not None:
+                self._bucket.acquire()  # Wait only if we are over the request rate
             response = self.session.post(
                 self.base_url,
                 json=payload,
-                timeout=self.timeout  # Simple timeout - both connect and read
+                timeout=(self.connect_timeout, self.timeout)
             )
-            print(response)
+            logger.debug("Response: %s", response)
             status_code = response.status_code
+            
+            if not MAVScraper._encoding_logged:
+                MAVScraper._encoding_logged = True
+                logger.info("API response Content-Encoding: %s (requested: %s)",
+                            response.headers.get('Content-Encoding', 'identity'), ACCEPT_ENCODING)
             call_end_time = datetime.now()
             
             if response.status_code == 200:
-                data = response.json()
-                response_data = data
-                routes_found = len(data.get('route', []))
+                # Decode straight from the body bytes (orjson when available)
+                data = json_loads(response.content)
+                routes = data.get('route', [])
+                routes_found = len(routes)
+                # The call log only needs a summary; don't hold the full response
+                # in the log queue
+                response_data = {
+                    'route_count': routes_found,
+                    'response_bytes': len(response.content),
+                    'first_delays': [route.get('delayMin', 0) for route in routes[:20]]
+                }
                 success = True
-                print(f" Successfully fetched {routes_found} routes")
+                logger.info("Successfully fetched %d routes", routes_found)
                 
                 # Log successful call
                 self._log_api_call(
@@ -213,11 +525,10 @@ class MAVScraper:
                     status_code, error_message, response_data
                 )
                 
-                return True, data
+                return True, data, response.content
             else:
                 error_message = f"HTTP {response.status_code}: {response.text[:200]}"
-                print(f" API returned status code {response.status_code}")
-                print(f"Response: {response.text[:200]}...")
+                logger.warning("API returned status code %s: %s...", response.status_code, response.text[:200])
                 
                 # Log failed call
                 self._log_api_call(
@@ -229,13 +540,12 @@ class MAVScraper:
                     status_code, error_message, response_data
                 )
                 
-                return False, {}
+                return False, {}, None
                 
         except requests.exceptions.Timeout as e:
             call_end_time = datetime.now()
             error_message = f"Request timeout after {self.timeout}s: {str(e)}"
-            print(f" Request timed out after {self.timeout} seconds - moving to next pair")
-            print(error_message)
+            logger.warning("Request timed out after %s seconds - moving to next pair: %s", self.timeout, e)
             self._log_api_call(
                 call_start_time, call_end_time,
                 start_station, start_station_name,
@@ -245,11 +555,11 @@ class MAVScraper:
                 status_code, error_message, response_data
             )
             
-            return False, {}
+            return False, {}, None
         except requests.exceptions.RequestException as e:
             call_end_time = datetime.now()
             error_message = f"Network error: {str(e)}"
-            print(f" Network error: {e}")
+            logger.warning("Network error: %s", e)
             
             self._log_api_call(
                 call_start_time, call_end_time,
@@ -260,11 +570,11 @@ class MAVScraper:
                 status_code, error_message, response_data
             )
             
-            return False, {}
+            return False, {}, None
         except json.JSONDecodeError as e:
             call_end_time = datetime.now()
             error_message = f"JSON decode error: {str(e)}"
-            print(f" JSON decode error: {e}")
+            logger.warning("JSON decode error: %s", e)
             
             self._log_api_call(
                 call_start_time, call_end_time,
@@ -275,11 +585,11 @@ class MAVScraper:
                 status_code, error_message, response_data
             )
             
-            return False, {}
+            return False, {}, None
         except Exception as e:
             call_end_time = datetime.now()
             error_message = f"Unexpected error: {str(e)}"
-            print(f" Unexpected error: {e}")
+            logger.error("Unexpected error: %s", e)
             
             self._log_api_call(
                 call_start_time, call_end_time,
@@ -290,7 +600,46 @@ class MAVScraper:
                 status_code, error_message, response_data
             )
             
-            return False, {}
+            return False, {}, None
+    
+    def _cache_get(self, key: str) -> Optional[bytes]:
+        """Return the cached response body for key if it is younger than cache_ttl."""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            stored_at, data = entry
+            if time.monotonic() - stored_at >= self.cache_ttl:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return data
+    
+    def _cache_put(self, key: str, body: bytes):
+        """Store a response body, evicting the least recently used entries past CACHE_MAX_ENTRIES."""
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), body)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+    
+    def fetch_routes_many(self, pairs: Iterable[Tuple], max_workers: int = DEFAULT_MAX_WORKERS) -> Iterator[Tuple[Tuple, bool, Dict]]:
+        """
+        Fetch routes for several station pairs concurrently over the shared session.
+        
+        Args:
+            pairs: Iterable of argument tuples for fetch_routes, e.g.
+                   (start_station, end_station) or (start_station, end_station, travel_date, start_time)
+            max_workers: Number of requests in flight at once
+            
+        Yields:
+            Tuples of (pair, success, data) in completion order
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.fetch_routes, *pair): pair for pair in pairs}
+            for future in as_completed(futures):
+                success, data = future.result()
+                yield futures[future], success, data
     
     def _log_api_call(self, start_time: datetime, end_time: datetime,
                       start_station_code: str, start_station_name: str,
@@ -299,9 +648,9 @@ class MAVScraper:
                       success: bool, routes_found: int,
                       status_code: Optional[int], error_message: str,
                       response_data: Optional[Dict]) -> None:
-        """Helper method to log API calls if logging is enabled."""
-        if self.enable_logging and self.logger:
-            self.logger.log_api_call(
+        """Helper method to queue API call log entries if logging is enabled."""
+        if self.enable_logging and self.logger is not None:
+            entry = dict(
                 start_time=start_time,
                 end_time=end_time,
                 start_station_code=start_station_code,
@@ -316,6 +665,11 @@ class MAVScraper:
                 error_message=error_message,
                 response_data=response_data
             )
+            try:
+                _log_queue.put_nowait((self.logger, entry))
+            except queue.Full:
+                logger.warning("API call log queue full, dropping entry for %s → %s",
+                               start_station_code, end_station_code)
     
     def parse_route_segments(self, route: Dict) -> List[Dict]:
         """
@@ -327,96 +681,72 @@ class MAVScraper:
         Returns:
             List of route segments with individual train details and timing
         """
+        return self._walk_route(route)[0]
+    
+    def _walk_route(self, route: Dict) -> Tuple[List[Dict], List[str]]:
+        """
+        Single pass over a route's legs building both the parsed segments and the
+        intermediate station names (leg end stations, excluding the final destination).
+        """
         segments = []
+        # (leg_number, station_name) in first-seen order
+        stops = []
+        seen_stations = set()
         
         # Look for route details directly in details['routes']
-        details = route.get('details', {})
-        routes = details.get('routes', [])
+        details = route.get('details', _EMPTY)
+        routes = details.get('routes', ())
         
         if not routes:
-            return segments
+            return segments, []
         
         for i, segment in enumerate(routes):
             try:
                 # Get train details
-                train_details = segment.get('trainDetails', {})
+                train_details = segment.get('trainDetails', _EMPTY)
                 train_name = train_details.get('name', 'Unknown')
                 train_number = train_details.get('trainNumber', 'Unknown')
                 train_full_name = f"{train_number} ({train_name})" if train_name != 'Unknown' else train_number
                 
                 # Get station details
-                start_station = segment.get('startStation', {})
-                end_station = segment.get('destionationStation', {})  # Note: API has typo "destionation"
+                start_station = segment.get('startStation', _EMPTY)
+                end_station = segment.get('destionationStation', _EMPTY)  # Note: API has typo "destionation"
                 start_station_name = start_station.get('name', 'Unknown')
                 end_station_name = end_station.get('name', 'Unknown')
                 
                 # Get timing from segment level
-                departure = segment.get('departure', {})
-                arrival = segment.get('arrival', {})
+                departure = segment.get('departure', _EMPTY)
+                arrival = segment.get('arrival', _EMPTY)
                 
-                # Parse scheduled departure time
-                dep_time = departure.get('time', '')
-                dep_scheduled_str = 'Unknown'
-                if dep_time and dep_time != "0001-01-01T00:00:00+01:00":
-                    try:
-                        dep_dt = datetime.fromisoformat(dep_time.replace('Z', '+00:00'))
-                        dep_scheduled_str = dep_dt.strftime('%H:%M')
-                    except:
-                        pass
+                # Parse each timestamp once; formatting and delays reuse the datetimes
+                dep_dt = _parse_ts(departure.get('time', ''))
+                dep_actual_dt = _parse_ts(departure.get('timeFact', ''))
+                arr_dt = _parse_ts(arrival.get('time', ''))
+                arr_actual_dt = _parse_ts(arrival.get('timeFact', ''))
                 
-                # Parse actual departure time
-                dep_fact = departure.get('timeFact', '')
-                dep_actual_str = 'Unknown'
-                dep_delay = 0
-                if dep_fact and dep_fact != "0001-01-01T00:00:00+01:00":
-                    try:
-                        dep_actual_dt = datetime.fromisoformat(dep_fact.replace('Z', '+00:00'))
-                        dep_actual_str = dep_actual_dt.strftime('%H:%M')
-                        if dep_time and dep_time != "0001-01-01T00:00:00+01:00":
-                            dep_delay = int((dep_actual_dt - dep_dt).total_seconds() / 60)
-                    except:
-                        pass
+                dep_scheduled_str = dep_dt.strftime('%H:%M') if dep_dt is not None else 'Unknown'
+                dep_actual_str = dep_actual_dt.strftime('%H:%M') if dep_actual_dt is not None else 'Unknown'
+                arr_scheduled_str = arr_dt.strftime('%H:%M') if arr_dt is not None else 'Unknown'
+                arr_actual_str = arr_actual_dt.strftime('%H:%M') if arr_actual_dt is not None else 'Unknown'
                 
-                # Parse scheduled arrival time
-                arr_time = arrival.get('time', '')
-                arr_scheduled_str = 'Unknown'
-                if arr_time and arr_time != "0001-01-01T00:00:00+01:00":
-                    try:
-                        arr_dt = datetime.fromisoformat(arr_time.replace('Z', '+00:00'))
-                        arr_scheduled_str = arr_dt.strftime('%H:%M')
-                    except:
-                        pass
-                
-                # Parse actual arrival time
-                arr_fact = arrival.get('timeFact', '')
-                arr_actual_str = 'Unknown'
-                arr_delay = 0
-                if arr_fact and arr_fact != "0001-01-01T00:00:00+01:00":
-                    try:
-                        arr_actual_dt = datetime.fromisoformat(arr_fact.replace('Z', '+00:00'))
-                        arr_actual_str = arr_actual_dt.strftime('%H:%M')
-                        if arr_time and arr_time != "0001-01-01T00:00:00+01:00":
-                            arr_delay = int((arr_actual_dt - arr_dt).total_seconds() / 60)
-                    except:
-                        pass
+                dep_delay = _delay_minutes(dep_actual_dt, dep_dt)
+                arr_delay = _delay_minutes(arr_actual_dt, arr_dt)
                 
                 # Calculate segment travel time
                 travel_time_str = 'Unknown'
-                if (dep_time and dep_time != "0001-01-01T00:00:00+01:00" and 
-                    arr_time and arr_time != "0001-01-01T00:00:00+01:00"):
+                if dep_dt is not None and arr_dt is not None:
                     try:
-                        dep_dt = datetime.fromisoformat(dep_time.replace('Z', '+00:00'))
-                        arr_dt = datetime.fromisoformat(arr_time.replace('Z', '+00:00'))
-                        travel_minutes = int((arr_dt - dep_dt).total_seconds() / 60)
-                        hours = travel_minutes // 60
-                        mins = travel_minutes % 60
-                        travel_time_str = f"{hours}:{mins:02d}"
-                    except:
+                        travel_minutes = _minutes(arr_dt - dep_dt)
+                        if 0 <= travel_minutes < len(_TRAVEL_TIME_STRINGS):
+                            travel_time_str = _TRAVEL_TIME_STRINGS[travel_minutes]
+                        else:
+                            travel_time_str = f"{travel_minutes // 60}:{travel_minutes % 60:02d}"
+                    except TypeError:
                         pass
                 
                 # Get services/amenities
                 services = []
-                train_services = segment.get('services', {}).get('train', [])
+                train_services = segment.get('services', _EMPTY).get('train', ())
                 for service in train_services:
                     desc = service.get('description', '')
                     if desc:
@@ -442,11 +772,21 @@ class MAVScraper:
                 
                 segments.append(segment_info)
                 
+                if end_station_name and end_station_name != 'Unknown' and end_station_name not in seen_stations:
+                    seen_stations.add(end_station_name)
+                    stops.append((i + 1, end_station_name))
+                
             except Exception as e:
                 print(f"⚠️ Error parsing route segment {i}: {e}")
                 continue
         
-        return segments
+        # Leg numbers only grow, so the final destination (and any stop whose
+        # leg number reaches the parsed segment count) sits at the tail
+        segment_count = len(segments)
+        while stops and stops[-1][0] >= segment_count:
+            stops.pop()
+        
+        return segments, [name for _, name in stops]
     
     def parse_route_info(self, route: Dict) -> Dict:
         """
@@ -460,12 +800,13 @@ class MAVScraper:
         """
         try:
             # Basic train info
-            train_name = route.get('details', {}).get('trainFullName', 'Unknown')
+            details = route.get('details', _EMPTY)
+            train_name = details.get('trainFullName', 'Unknown')
             delay_min = route.get('delayMin', 0)
             travel_time = route.get('travelTimeMin', 0)
             
             # Parse departure time (scheduled vs actual)
-            departure = route.get('departure', {})
+            departure = route.get('departure', _EMPTY)
             dep_time_scheduled = departure.get('time', '')
             dep_time_expected = departure.get('timeExpected', '')
             dep_time_fact = departure.get('timeFact', '')
@@ -481,7 +822,7 @@ class MAVScraper:
                 dep_dt = None
                 
             # Parse arrival time (scheduled vs actual)
-            arrival = route.get('arrival', {})
+            arrival = route.get('arrival', _EMPTY)
             arr_time_scheduled = arrival.get('time', '')
             arr_time_expected = arrival.get('timeExpected', '')
             arr_time_fact = arrival.get('timeFact', '')
@@ -495,36 +836,21 @@ class MAVScraper:
                 arr_iso = None
                 arr_dt = None
                 
-            # Parse ACTUAL departure time from timeFact
-            actual_dep_str = None
-            dep_delay = 0
-            if dep_time_fact and dep_time_fact != "0001-01-01T00:00:00+01:00":
-                try:
-                    actual_dep_dt = datetime.fromisoformat(dep_time_fact.replace('Z', '+00:00'))
-                    actual_dep_str = actual_dep_dt.strftime('%H:%M')
-                    if dep_dt:
-                        dep_delay = int((actual_dep_dt - dep_dt).total_seconds() / 60)
-                except:
-                    pass
-                    
-            # Parse ACTUAL arrival time from timeFact
-            actual_arr_str = None
-            arr_delay = 0
-            if arr_time_fact and arr_time_fact != "0001-01-01T00:00:00+01:00":
-                try:
-                    actual_arr_dt = datetime.fromisoformat(arr_time_fact.replace('Z', '+00:00'))
-                    actual_arr_str = actual_arr_dt.strftime('%H:%M')
-                    if arr_dt:
-                        arr_delay = int((actual_arr_dt - arr_dt).total_seconds() / 60)
-                except:
-                    pass
+            # Parse ACTUAL departure/arrival times from timeFact
+            actual_dep_dt = _parse_ts(dep_time_fact)
+            actual_dep_str = actual_dep_dt.strftime('%H:%M') if actual_dep_dt is not None else None
+            dep_delay = _delay_minutes(actual_dep_dt, dep_dt)
+            
+            actual_arr_dt = _parse_ts(arr_time_fact)
+            actual_arr_str = actual_arr_dt.strftime('%H:%M') if actual_arr_dt is not None else None
+            arr_delay = _delay_minutes(actual_arr_dt, arr_dt)
             
             # Extract transfers, prices, and services
             transfers_count = route.get('transfersCount', 0)
             
             # Get price from travel classes (usually 2nd class)
             price_huf = None
-            travel_classes = route.get('travelClasses', [])
+            travel_classes = route.get('travelClasses', ())
             if travel_classes:
                 # Try to get 2nd class price first, fall back to any available
                 second_class = next((tc for tc in travel_classes if tc and tc.get('name') == '2'), None)
@@ -539,7 +865,7 @@ class MAVScraper:
             
             # Extract route services (like seat reservation requirements)
             services = []
-            route_services = route.get('routeServices', [])
+            route_services = route.get('routeServices', ())
             for service in route_services:
                 services.append(service.get('description', ''))
             
@@ -550,18 +876,8 @@ class MAVScraper:
             arr_track_obj = route.get('arrivalTrack')
             arr_track = arr_track_obj.get('changedTrackName', '') if arr_track_obj and isinstance(arr_track_obj, dict) else ''
             
-            # Get intermediate stations and route segments
-            route_segments = self.parse_route_segments(route)
-            
-            # Extract intermediate stations from segments
-            intermediate_stations = []
-            for segment in route_segments:
-                # Use the station names from the segments as intermediate stations
-                station_name = segment.get('end_station', '')
-                if station_name and station_name != 'Unknown' and station_name not in intermediate_stations:
-                    # Don't include the final destination
-                    if segment.get('leg_number', 1) < len(route_segments):
-                        intermediate_stations.append(station_name)
+            # Get route segments and intermediate stations in one walk over the legs
+            route_segments, intermediate_stations = self._walk_route(route)
             
             # Calculate overall delay (max of departure or arrival delay)
             total_delay = max(dep_delay, arr_delay, delay_min)
@@ -633,20 +949,32 @@ class MAVScraper:
                 'delayed_percentage': 0
             }
         
-        delays = [route.get('delayMin', 0) for route in routes]
-        trains_on_time = len([d for d in delays if d == 0])
-        trains_delayed = len([d for d in delays if d > 0])
-        trains_significantly_delayed = len([d for d in delays if d > 5])
+        # One pass over the routes; delayMin may be fractional, so keep it as-is
+        total = len(routes)
+        delay_sum = 0
+        max_delay = None
+        trains_on_time = trains_delayed = trains_significantly_delayed = 0
+        for route in routes:
+            delay = route.get('delayMin', 0)
+            delay_sum += delay
+            if max_delay is None or delay > max_delay:
+                max_delay = delay
+            if delay == 0:
+                trains_on_time += 1
+            elif delay > 0:
+                trains_delayed += 1
+                if delay > 5:
+                    trains_significantly_delayed += 1
         
         return {
-            'total_trains': len(delays),
-            'average_delay': round(sum(delays) / len(delays), 1),
-            'max_delay': max(delays) if delays else 0,
+            'total_trains': total,
+            'average_delay': round(delay_sum / total, 1),
+            'max_delay': max_delay,
             'trains_on_time': trains_on_time,
             'trains_delayed': trains_delayed,
             'trains_significantly_delayed': trains_significantly_delayed,
-            'on_time_percentage': round((trains_on_time / len(delays)) * 100, 1),
-            'delayed_percentage': round((trains_delayed / len(delays)) * 100, 1)
+            'on_time_percentage': round((trains_on_time / total) * 100, 1),
+            'delayed_percentage': round((trains_delayed / total) * 100, 1)
         }
     
     def display_results(self, routes: List[Dict], stats: Dict, limit: int = 5):
@@ -656,83 +984,90 @@ class MAVScraper:
         Args:
             routes: List of parsed route dictionaries
             stats: Delay statistics dictionary
-            limit: Maximum number of routes to display
+            limit: Maximum number of routes to display (0 disables output)
         """
-        print("\n" + "="*50)
-        print("🚆 TRAIN SCHEDULE & DELAY ANALYSIS")
-        print("="*50)
+        if not limit:
+            return
         
-        print(f"\n📊 DELAY STATISTICS")
-        print(f"Total trains: {stats['total_trains']}")
-        print(f"Average delay: {stats['average_delay']} minutes")
-        print(f"Maximum delay: {stats['max_delay']} minutes")
-        print(f"On time: {stats['trains_on_time']}/{stats['total_trains']} ({stats['on_time_percentage']}%)")
-        print(f"Delayed: {stats['trains_delayed']}/{stats['total_trains']} ({stats['delayed_percentage']}%)")
-        print(f"Significantly delayed (>5min): {stats['trains_significantly_delayed']}/{stats['total_trains']}")
-        
-        print(f"\n🚂 TRAIN SCHEDULES (showing first {min(limit, len(routes))})")
-        print("-" * 50)
+        # Collect everything and write once instead of a print() per line
+        lines = [
+            "\n" + "="*50,
+            "🚆 TRAIN SCHEDULE & DELAY ANALYSIS",
+            "="*50,
+            f"\n📊 DELAY STATISTICS",
+            f"Total trains: {stats['total_trains']}",
+            f"Average delay: {stats['average_delay']} minutes",
+            f"Maximum delay: {stats['max_delay']} minutes",
+            f"On time: {stats['trains_on_time']}/{stats['total_trains']} ({stats['on_time_percentage']}%)",
+            f"Delayed: {stats['trains_delayed']}/{stats['total_trains']} ({stats['delayed_percentage']}%)",
+            f"Significantly delayed (>5min): {stats['trains_significantly_delayed']}/{stats['total_trains']}",
+            f"\n🚂 TRAIN SCHEDULES (showing first {min(limit, len(routes))})",
+            "-" * 50,
+        ]
+        add = lines.append
         
         for i, route in enumerate(routes[:limit]):
             delay_emoji = "🟢" if route['delay_min'] == 0 else "🟡" if route['delay_min'] <= 5 else "🔴"
             
-            print(f"{i+1}. {route['train_name']}")
+            add(f"{i+1}. {route['train_name']}")
             
             # Show departure time (actual vs scheduled)
             if route.get('departure_time_actual') and route['departure_time_actual'] != route['departure_time']:
-                print(f"   Scheduled departure: {route['departure_time']}")
-                print(f"   Actual departure: {route['departure_time_actual']}")
+                add(f"   Scheduled departure: {route['departure_time']}")
+                add(f"   Actual departure: {route['departure_time_actual']}")
                 if route.get('departure_delay_min', 0) > 0:
-                    print(f"   Departure delay: {route['departure_delay_min']} min")
+                    add(f"   Departure delay: {route['departure_delay_min']} min")
             else:
-                print(f"   Departure: {route['departure_time']}")
+                add(f"   Departure: {route['departure_time']}")
             
             # Show arrival time (actual vs scheduled)
             if route.get('arrival_time_actual') and route['arrival_time_actual'] != route['arrival_time']:
-                print(f"   Scheduled arrival: {route['arrival_time']}")
-                print(f"   Actual arrival: {route['arrival_time_actual']}")
+                add(f"   Scheduled arrival: {route['arrival_time']}")
+                add(f"   Actual arrival: {route['arrival_time_actual']}")
                 if route.get('arrival_delay_min', 0) > 0:
-                    print(f"   Arrival delay: {route['arrival_delay_min']} min")
+                    add(f"   Arrival delay: {route['arrival_delay_min']} min")
             else:
-                print(f"   Arrival: {route['arrival_time']}")
+                add(f"   Arrival: {route['arrival_time']}")
                 
-            print(f"   Travel time: {route['travel_time_min']}")
-            print(f"   Transfers: {route.get('transfers_count', 0)}")
+            add(f"   Travel time: {route['travel_time_min']}")
+            add(f"   Transfers: {route.get('transfers_count', 0)}")
             
             # Show intermediate stations
             if route.get('intermediate_stations'):
                 stations_str = ", ".join(route['intermediate_stations'])
-                print(f"   Via: {stations_str}")
+                add(f"   Via: {stations_str}")
             
             # Show price
             if route.get('price_huf'):
-                print(f"   Price: {route['price_huf']:,} HUF")
+                add(f"   Price: {route['price_huf']:,} HUF")
             
             # Show track info
             if route.get('departure_track'):
-                print(f"   Platform: {route['departure_track']}")
+                add(f"   Platform: {route['departure_track']}")
                 
             # Show services
             if route.get('services'):
                 services_str = ", ".join(route['services'][:2])  # Show first 2 services
                 if len(services_str) > 50:
                     services_str = services_str[:50] + "..."
-                print(f"   Services: {services_str}")
+                add(f"   Services: {services_str}")
             
-            print(f"   {delay_emoji} Status: {route['delay_min']} min delay")
+            add(f"   {delay_emoji} Status: {route['delay_min']} min delay")
             
             # Show route segments for transfers
             if route.get('route_segments') and len(route['route_segments']) > 1:
-                print(f"   Route details:")
+                add(f"   Route details:")
                 for j, segment in enumerate(route['route_segments']):
-                    if segment['start_station_name']:
-                        print(f"     {j+1}. {segment['start_station_name']} → {segment['end_station_name']}")
-                        print(f"        {segment['departure_time']} → {segment['arrival_time']} ({segment['travel_time']})")
+                    if segment['start_station']:
+                        add(f"     {j+1}. {segment['start_station']} → {segment['end_station']}")
+                        add(f"        {segment['departure_scheduled']} → {segment['arrival_scheduled']} ({segment['travel_time']})")
             
-            print()
+            add("")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def save_data(self, raw_data: Dict, parsed_routes: List[Dict], 
-                  stats: Dict, output_dir: str = "output"):
+                  stats: Dict, output_dir: str = "output", pretty: bool = False):
         """
         Save scraping results to JSON files.
         
@@ -741,24 +1076,24 @@ class MAVScraper:
             parsed_routes: List of parsed route dictionaries
             stats: Delay statistics
             output_dir: Directory to save files in
+            pretty: Indent the JSON (slower, larger files)
         """
-        os.makedirs(output_dir, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        ensure_dir(output_dir)
+        now = datetime.now()
+        timestamp = format_timestamp(now)
         
         # Save raw data
-        raw_file = os.path.join(output_dir, f"mav_raw_data_{timestamp}.json")
-        with open(raw_file, 'w', encoding='utf-8') as f:
-            json.dump(raw_data, f, ensure_ascii=False, indent=2)
+        raw_file = f"{output_dir}{os.sep}mav_raw_data_{timestamp}.json"
+        write_json(raw_file, raw_data, pretty=pretty)
         
         # Save processed data
         processed_data = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now.isoformat(),
             'statistics': stats,
             'routes': parsed_routes
         }
-        processed_file = os.path.join(output_dir, f"mav_processed_data_{timestamp}.json")
-        with open(processed_file, 'w', encoding='utf-8') as f:
-            json.dump(processed_data, f, ensure_ascii=False, indent=2)
+        processed_file = f"{output_dir}{os.sep}mav_processed_data_{timestamp}.json"
+        write_json(processed_file, processed_data, pretty=pretty)
         
         print(f"\n📁 Data saved:")
         print(f"   Raw data: {raw_file}")
@@ -769,7 +1104,8 @@ class MAVScraper:
                     start_time: Optional[str] = "01:00",
                     save_results: bool = True,
                     save_json: bool = False,
-                    display_limit: int = 5) -> Dict:
+                    display_limit: int = 5,
+                    pretty: bool = False) -> Dict:
         """
         Complete scraping workflow for a route.
         
@@ -779,33 +1115,27 @@ class MAVScraper:
             travel_date: Optional travel date
             save_results: Whether to save results to files
             display_limit: Number of routes to display
+            pretty: Also write indented JSON files when saving
             
         Returns:
             Dictionary with all results
         """
-        # Fetch data
-        success, raw_data = self.fetch_routes(start_station, end_station, travel_date, start_time, "", "")
+        success, raw_data, parsed_routes, stats = self._fetch_and_parse(
+            start_station, end_station, travel_date, start_time)
         
         if not success:
             return {'success': False, 'error': 'Failed to fetch data'}
         
-        # Parse routes
-        routes_raw = raw_data.get('route', [])
-        parsed_routes = [self.parse_route_info(route) for route in routes_raw]
-        
-        # Calculate statistics
-        stats = self.calculate_delay_statistics(routes_raw)
-        
         # Display results
         self.display_results(parsed_routes, stats, display_limit)
         
         # Save data if requested
         if save_results:
-            self.save_data(raw_data, parsed_routes, stats)
+            self.save_data(raw_data, parsed_routes, stats, pretty=pretty)
             
         # Save as clean JSON if requested
         if save_json:
-            self.save_json_data(start_station, end_station, parsed_routes, stats)
+            self.save_json_data(start_station, end_station, parsed_routes, stats, pretty=pretty)
         
         return {
             'success': True,
@@ -814,47 +1144,58 @@ class MAVScraper:
             'statistics': stats
         }
     
-    def _get_timestamp(self):
-        """Get current timestamp in ISO format."""
-        return datetime.now().isoformat()
+    def _fetch_and_parse(self, start_station: str, end_station: str,
+                         travel_date: Optional[str] = None,
+                         start_time: Optional[str] = "01:00") -> Tuple[bool, Optional[Dict], List[Dict], Dict]:
+        """
+        Fetch a route and parse it, without any console output or file saving.
+        
+        Returns:
+            Tuple of (success, raw_data, parsed_routes, statistics)
+        """
+        success, raw_data = self.fetch_routes(start_station, end_station, travel_date, start_time, "", "")
+        
+        if not success:
+            return False, None, [], {}
+        
+        # Parse routes
+        routes_raw = raw_data.get('route', [])
+        parsed_routes = [self.parse_route_info(route) for route in routes_raw]
+        
+        # Calculate statistics
+        stats = self.calculate_delay_statistics(routes_raw)
+        
+        return True, raw_data, parsed_routes, stats
     
-    def scrape_to_json(self, start_station: str, end_station: str, 
+    def scrape_to_dict(self, start_station: str, end_station: str, 
                       travel_date: Optional[str] = None,
-                      start_time: Optional[str] = "01:00",
-                      pretty: bool = True) -> str:
+                      start_time: Optional[str] = "01:00") -> Dict:
         """
-        Scrape route and return as JSON string.
+        Scrape route and return the JSON-ready result dictionary.
         
         Args:
             start_station: Starting station code
             end_station: Ending station code
             travel_date: Optional travel date
-            pretty: Whether to format JSON nicely
             
         Returns:
-            JSON string with route data
+            Dictionary with route data, as serialized by scrape_to_json
         """
         # Fetch data without console output
-        success, raw_data = self.fetch_routes(start_station, end_station, travel_date, start_time, "", "")
+        success, _, parsed_routes, stats = self._fetch_and_parse(
+            start_station, end_station, travel_date, start_time)
         
         if not success:
-            return json.dumps({
+            return {
                 "success": False,
                 "error": "Failed to fetch data from MÁV API",
-                "timestamp": self._get_timestamp()
-            }, indent=2 if pretty else None)
-        
-        # Parse routes
-        routes_raw = raw_data.get('route', [])
-        parsed_routes = [self.parse_route_info(route) for route in routes_raw]
-        
-        # Calculate statistics
-        stats = self.calculate_delay_statistics(routes_raw)
+                "timestamp": datetime.now().isoformat()
+            }
         
         # Build JSON response
         result = {
             "success": True,
-            "timestamp": self._get_timestamp(),
+            "timestamp": datetime.now().isoformat(),
             "route_info": {
                 "start_station": start_station,
                 "end_station": end_station,
@@ -865,11 +1206,30 @@ class MAVScraper:
             "total_routes": len(parsed_routes)
         }
         
-        return json.dumps(result, indent=2 if pretty else None, ensure_ascii=False)
+        return result
+    
+    def scrape_to_json(self, start_station: str, end_station: str, 
+                      travel_date: Optional[str] = None,
+                      start_time: Optional[str] = "01:00",
+                      pretty: bool = True) -> str:
+        """
+        Scrape route and return as JSON string.
+        
+        Args:
+            start_station: Starting station code
+            end_station: Ending station code
+            travel_date: Optional travel date
+            pretty: Whether to format JSON nicely
+            
+        Returns:
+            JSON string with route data
+        """
+        result = self.scrape_to_dict(start_station, end_station, travel_date, start_time)
+        return dumps_bytes(result, pretty).decode('utf-8')
     
     def save_json_data(self, start_station: str, end_station: str, 
                       parsed_routes: List[Dict], stats: Dict, 
-                      output_dir: str = "json_output"):
+                      output_dir: str = "json_output", pretty: bool = False):
         """
         Save clean JSON data to files.
         
@@ -879,14 +1239,16 @@ class MAVScraper:
             parsed_routes: List of parsed route dictionaries
             stats: Delay statistics
             output_dir: Directory to save files in
+            pretty: Also write the indented copy next to the compact file
         """
-        os.makedirs(output_dir, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        ensure_dir(output_dir)
+        now = datetime.now()
+        timestamp = format_timestamp(now)
         
         # Build clean JSON structure
         json_data = {
             "success": True,
-            "timestamp": self._get_timestamp(),
+            "timestamp": now.isoformat(),
             "route_info": {
                 "start_station": start_station,
                 "end_station": end_station
@@ -896,38 +1258,48 @@ class MAVScraper:
             "total_routes": len(parsed_routes)
         }
         
-        # Save pretty JSON
-        pretty_file = os.path.join(output_dir, f"mav_routes_{start_station}_{end_station}_{timestamp}.json")
-        with open(pretty_file, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
+        # Both names share a prefix; plain concatenation since the layout is fixed
+        base_path = f"{output_dir}{os.sep}mav_routes_{start_station}_{end_station}_{timestamp}"
+        compact_file = f"{base_path}_compact.json"
+        
+        # Save pretty JSON (only on request; indenting dominates encode time)
+        pretty_file = None
+        if pretty:
+            pretty_file = f"{base_path}.json"
+            write_json(pretty_file, json_data, pretty=True)
         
         # Save compact JSON
-        compact_file = os.path.join(output_dir, f"mav_routes_{start_station}_{end_station}_{timestamp}_compact.json")
-        with open(compact_file, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, ensure_ascii=False)
+        write_json(compact_file, json_data)
         
         print(f"\n📁 JSON files saved:")
-        print(f"   📄 Pretty: {pretty_file}")
+        if pretty_file:
+            print(f"   📄 Pretty: {pretty_file}")
         print(f"   📦 Compact: {compact_file}")
 
-    def format_travel_time(self, travel_time) -> str:
-        """Format travel time from minutes (int) or HH:MM string format."""
-        if not travel_time:
-            return "Unknown"
-        
-        # If it's already in HH:MM format, return it
-        if isinstance(travel_time, str) and ":" in travel_time:
-            return travel_time
+    @staticmethod
+    def travel_minutes(travel_time) -> Optional[int]:
+        """
+        Travel time as whole minutes, for comparing routes.
         
-        # If it's a number (minutes), convert to HH:MM
+        Accepts minutes (int) or an H:MM / HH:MM string, like format_travel_time.
+        Returns None for zero or unparseable values.
+        """
         try:
-            minutes_int = int(travel_time)
-            if minutes_int == 0:
-                return "Unknown"
-            hours = minutes_int // 60
-            mins = minutes_int % 60
-            return f"{hours:02d}:{mins:02d}"
+            if isinstance(travel_time, str):
+                hours, _, mins = travel_time.partition(':')
+                minutes = int(hours) * 60 + int(mins) if mins else int(hours)
+            else:
+                minutes = int(travel_time)
         except (ValueError, TypeError):
+            return None
+        return minutes or None
+
+    def format_travel_time(self, travel_time) -> str:
+        """Format travel time from minutes (int) or HH:MM string format."""
+        try:
+            return _format_travel_time(travel_time)
+        except TypeError:
+            # Unhashable input can't be a travel time
             return "Unknown"
 
     def create_simplified_output(self, routes: List[Dict]) -> List[Dict]:
@@ -940,66 +1312,35 @@ class MAVScraper:
         Returns:
             List of simplified route entries
         """
-        simplified_routes = []
+        return [self._build_simplified_entry(i, route) for i, route in enumerate(routes, 1)]
+
+    def _build_simplified_entry(self, option_number: int, route: Dict) -> Dict:
+        """Build one simplified route entry for create_simplified_output."""
+        # Get actual or scheduled departure time
+        departure_time = route.get('departure_time_actual') or route.get('departure_time', 'Unknown')
         
-        for i, route in enumerate(routes, 1):
-            # Get actual or scheduled departure time
-            departure_time = route.get('departure_time_actual') or route.get('departure_time', 'Unknown')
-            
-            # Get scheduled and actual arrival times
-            scheduled_arrival = route.get('arrival_time', 'Unknown')
-            actual_arrival = route.get('arrival_time_actual') or scheduled_arrival
-            
-            # Format travel time
-            travel_time = self.format_travel_time(route.get('travel_time_min', 0))
-            
-            # Get transfers
-            transfers = route.get('transfers_count', 0)
-            
-            # Format price
-            price_huf = route.get('price_huf')
-            price_str = f"{price_huf:,} HUF".replace(',', ' ') if price_huf else "Price unavailable"
-            
+        # Get scheduled and actual arrival times
+        scheduled_arrival = route.get('arrival_time', 'Unknown')
+        actual_arrival = route.get('arrival_time_actual') or scheduled_arrival
+        
+        # Format price
+        price_huf = route.get('price_huf')
+        price_str = f"{price_huf:_} HUF".replace('_', ' ') if price_huf else "Price unavailable"
+        
+        return {
+            "option_number": option_number,
+            "departure_time": departure_time,
+            "scheduled_arrival_time": scheduled_arrival,
+            "actual_arrival_time": actual_arrival,
+            "travel_time": self.format_travel_time(route.get('travel_time_min', 0)),
+            "transfers": route.get('transfers_count', 0),
+            "price": price_str,
             # Determine availability (for now, assume unavailable as per user's examples)
             # This would need to be enhanced based on actual API response structure
-            availability = "This offer is not available."
-            
-            # Get detailed route segments (individual train legs)
-            route_segments = route.get('route_segments', [])
-            train_legs = []
-            
-            for segment in route_segments:
-                leg_info = {
-                    "leg_number": segment.get('leg_number', 1),
-                    "train": segment.get('train_full_name', 'Unknown'),
-                    "from_station": segment.get('start_station', 'Unknown'),
-                    "to_station": segment.get('end_station', 'Unknown'),
-                    "scheduled_departure": segment.get('departure_scheduled', 'Unknown'),
-                    "actual_departure": segment.get('departure_actual', 'Unknown'),
-                    "departure_delay_min": segment.get('departure_delay', 0),
-                    "scheduled_arrival": segment.get('arrival_scheduled', 'Unknown'),
-                    "actual_arrival": segment.get('arrival_actual', 'Unknown'),
-                    "arrival_delay_min": segment.get('arrival_delay', 0),
-                    "travel_time": segment.get('travel_time', 'Unknown'),
-                    "services": segment.get('services', [])
-                }
-                train_legs.append(leg_info)
-            
-            simplified_entry = {
-                "option_number": i,
-                "departure_time": departure_time,
-                "scheduled_arrival_time": scheduled_arrival,
-                "actual_arrival_time": actual_arrival,
-                "travel_time": travel_time,
-                "transfers": transfers,
-                "price": price_str,
-                "availability": availability,
-                "train_legs": train_legs  # Added detailed route segments
-            }
-            
-            simplified_routes.append(simplified_entry)
-            
-        return simplified_routes
+            "availability": "This offer is not available.",
+            # Detailed route segments (individual train legs)
+            "train_legs": [_make_leg(segment) for segment in route.get('route_segments', ())]
+        }
 
     def scrape_to_simplified_json(self, 
                                 start_station: str, 
@@ -1018,46 +1359,45 @@ class MAVScraper:
         Returns:
             Dictionary with simplified route data and metadata
         """
-        # Use existing scrape method to get data (without saving files)
-        result = self.scrape_route(start_station, end_station, travel_date, start_time, 
-                                 save_results=False, save_json=False, display_limit=0)
+        now = datetime.now()
+        
+        # Fetch and parse only - no display, no files
+        success, _, parsed_routes, _ = self._fetch_and_parse(
+            start_station, end_station, travel_date, start_time)
         
-        if not result['success']:
+        if not success:
             return {
                 'success': False,
-                'error': result.get('error', 'Unknown error'),
+                'error': 'Failed to fetch data',
                 'simplified_routes': []
             }
         
         # Create simplified output
-        simplified_routes = self.create_simplified_output(result['parsed_routes'])
+        simplified_routes = self.create_simplified_output(parsed_routes)
         
-        # Extract prices for summary
-        prices = []
-        for route in simplified_routes:
-            price_str = route.get('price', '')
-            if 'HUF' in price_str:
-                try:
-                    price_num = int(price_str.replace(' HUF', '').replace(' ', ''))
-                    prices.append(price_num)
-                except:
-                    pass
+        # Extract prices for summary (numeric, straight from the parsed routes)
+        prices = [route['price_huf'] for route in parsed_routes if route.get('price_huf')]
+        
+        # Fastest by minutes, not by comparing "HH:MM" strings
+        timed = ((self.travel_minutes(route.get('travel_time_min')), route) for route in parsed_routes)
+        fastest = min((item for item in timed if item[0]), key=lambda item: item[0], default=None)
+        fastest_time = self.format_travel_time(fastest[1]['travel_time_min']) if fastest else 'N/A'
         
         return {
             'success': True,
             'route_info': {
                 'from_station': start_station,
                 'to_station': end_station,
-                'travel_date': travel_date or datetime.now().strftime('%Y-%m-%d'),
+                'travel_date': travel_date or now.strftime('%Y-%m-%d'),
                 'start_time': start_time
             },
             'summary': {
                 'total_options': len(simplified_routes),
-                'cheapest_price': f"{min(prices):,} HUF".replace(',', ' ') if prices else 'N/A',
-                'fastest_time': min([r.get('travel_time', '99:99') for r in simplified_routes if r.get('travel_time') != 'Unknown'], default='N/A')
+                'cheapest_price': f"{min(prices):_} HUF".replace('_', ' ') if prices else 'N/A',
+                'fastest_time': fastest_time
             },
             'simplified_routes': simplified_routes,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now.isoformat()
         }
 
 
@@ -1065,6 +1405,7 @@ def main():
     """
     Main function with example usage of the MÁV scraper.
     """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     scraper = MAVScraper()
     
     # Default route from your quick_test.py
@@ -1080,7 +1421,8 @@ def main():
         end_station=end_station,
         save_results=True,
         save_json=True,
-        display_limit=10
+        display_limit=10,
+        pretty=True
     )
     
     if results['success']:
@@ -5,11 +5,43 @@ Loads the official MÁV stations.json file and provides search functionality
 to find station codes by name.
 """
 
-import json
+import heapq
+import logging
 import os
-from typing import List, Dict, Optional
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Dict, Optional, Tuple
 import re
 
+from json_utils import loads as json_loads
+
+logger = logging.getLogger(__name__)
+
+# Name classification bits, computed once per station at load time
+_RAIL = 1      # 'vasútállomás' (railway station)
+_STATION = 2   # 'állomás' (station)
+_BUS = 4       # 'autóbusz' (bus)
+_STOP = 8      # 'megállóhely' (halt)
+_RAILWAY_FLAGS = _RAIL | _STATION
+_NON_RAIL_FLAGS = _BUS | _STOP
+
+# All keywords in one alternation, so each name is scanned once. Matches don't
+# overlap, so 'vasútállomás' carries the bit of the 'állomás' it contains.
+_KEYWORD_RE = re.compile(r'vasútállomás|állomás|autóbusz|megállóhely')
+_KEYWORD_FLAGS = {
+    'vasútállomás': _RAIL | _STATION,
+    'állomás': _STATION,
+    'autóbusz': _BUS,
+    'megállóhely': _STOP,
+}
+
+def _classify(name_lower: str) -> int:
+    """Bitmask of the railway/bus keywords found in a lowercased station name."""
+    flags = 0
+    for keyword in _KEYWORD_RE.findall(name_lower):
+        flags |= _KEYWORD_FLAGS[keyword]
+    return flags
+
 class MAVStationLookup:
     """Utility class for looking up MÁV station codes by name."""
     
@@ -37,20 +69,53 @@ class MAVStationLookup:
                 
         self.stations_file = stations_file_path
         self.stations = []
+        # Lowercased names, parallel to self.stations (built once per load)
+        self._names_lc = []
+        self._nwc_lc = []
+        self._flags = []
+        # Exact lowercase name -> index of the station search_stations ranks first for it
+        self._by_name_lc = {}
+        # Per-instance memo of search results, keyed on (normalized query, limit)
+        self._search_cached = lru_cache(maxsize=2048)(self._scan)
         self.load_stations()
     
     def load_stations(self):
         """Load stations from the JSON file."""
         try:
             if os.path.exists(self.stations_file):
-                with open(self.stations_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.stations = data.get('stations', [])
-                print(f"✅ Loaded {len(self.stations)} stations from MÁV database")
+                # Parse the raw bytes (orjson when available) - no text decoding pass
+                with open(self.stations_file, 'rb') as f:
+                    data = json_loads(f.read())
+                self.stations = data.get('stations', [])
+                self._build_index()
+                self._search_cached.cache_clear()
+                logger.debug("Loaded %d stations from MÁV database", len(self.stations))
             else:
-                print(f"❌ Stations file not found: {self.stations_file}")
+                logger.error("Stations file not found: %s", self.stations_file)
         except Exception as e:
-            print(f"❌ Error loading stations: {e}")
+            logger.error("Error loading stations: %s", e)
+    
+    def _build_index(self):
+        """Precompute lowercase names and keyword flags so searches don't redo them per query."""
+        self._names_lc = [station.get('name', '').lower() for station in self.stations]
+        self._nwc_lc = [station.get('nameWithoutComma', '').lower() for station in self.stations]
+        self._flags = [_classify(name) for name in self._names_lc]
+        
+        # Any exact match (+100) outranks every non-exact one (at most 85), so for
+        # an exact-name query the top search result is the best-scoring exact
+        # match, earliest in file order on ties. Score each candidate the same way.
+        by_name = {}
+        best_score = {}
+        for i, (name, name_without_comma, flags) in enumerate(zip(
+                self._names_lc, self._nwc_lc, self._flags)):
+            railway = 50 if flags & _RAILWAY_FLAGS else 0
+            for key in {name, name_without_comma}:
+                pos = name.find(key)
+                score = 100 + railway + (25 if pos == 0 else 0) + (10 if pos >= 0 else 0)
+                if score > best_score.get(key, -1):
+                    best_score[key] = score
+                    by_name[key] = i
+        self._by_name_lc = by_name
     
     def search_stations(self, query: str, limit: int = 10) -> List[Dict]:
         """
@@ -63,41 +128,45 @@ class MAVStationLookup:
         Returns:
             List of matching station dictionaries
         """
+        stations = self.stations
+        return [stations[i] for i in self._search_indices(query, limit)]
+    
+    def _search_indices(self, query: str, limit: int) -> Tuple[int, ...]:
+        """search_stations, returning indices into self.stations."""
+        return self._search_cached(query.lower().strip(), limit)
+    
+    def _scan(self, query_lower: str, limit: int) -> Tuple[int, ...]:
+        """Score every station against an already normalized query (memoized per instance)."""
         if not self.stations:
-            return []
+            return ()
         
-        query_lower = query.lower().strip()
         matches = []
         
-        for station in self.stations:
-            name = station.get('name', '').lower()
-            name_without_comma = station.get('nameWithoutComma', '').lower()
+        for i, (name, name_without_comma, flags) in enumerate(zip(
+                self._names_lc, self._nwc_lc, self._flags)):
+            
+            # One find per name gives both "contains" (>= 0) and "starts with" (== 0)
+            pos = name.find(query_lower)
             
             # Check if query matches station name
-            if (query_lower in name or 
-                query_lower in name_without_comma or
-                name.startswith(query_lower) or
-                name_without_comma.startswith(query_lower)):
+            if pos >= 0 or query_lower in name_without_comma:
                 
                 # Prioritize exact matches and railway stations
                 score = 0
                 if query_lower == name or query_lower == name_without_comma:
                     score += 100  # Exact match
-                if 'vasútállomás' in name or 'állomás' in name:
+                if flags & _RAILWAY_FLAGS:
                     score += 50   # Railway station
-                if name.startswith(query_lower):
+                if pos == 0:
                     score += 25   # Starts with query
-                if query_lower in name:
+                if pos >= 0:
                     score += 10   # Contains query
                 
-                matches.append({
-                    'station': station,
-                    'score': score
-                })
+                matches.append((score, i))
         
-        # Sort by score (highest first) and return top results
-        matches.sort(key=lambda x: x['score'], reverse=True)
-        return [match['station'] for match in matches[:limit]]
+        # Top results by score (highest first); nlargest keeps ties in station order
+        # like a stable sort would, without sorting every match
+        return tuple(i for _, i in heapq.nlargest(limit, matches, key=itemgetter(0)))
     
     def find_station_code(self, name: str) -> Optional[str]:
         """
@@ -109,7 +178,12 @@ class MAVStationLookup:
         Returns:
             Station code if found, None otherwise
         """
-        results = self.search_stations(name, limit=1)
+        # Exact name: dictionary hit instead of a full scan
+        index = self._by_name_lc.get(name.lower().strip())
+        if index is not None:
+            results = [self.stations[index]]
+        else:
+            results = self.search_stations(name, limit=1)
         if results and results[0].get('canUseForOfferRequest', False):
             return results[0].get('code')
         return None
@@ -124,16 +198,15 @@ class MAVStationLookup:
         Returns:
             List of railway station dictionaries
         """
-        all_results = self.search_stations(query, limit=20)
         railway_stations = []
         
-        for station in all_results:
-            name = station.get('name', '').lower()
+        for i in self._search_indices(query, 20):
+            station = self.stations[i]
+            flags = self._flags[i]
             # Filter for railway stations only
-            if ('vasútállomás' in name or 
-                'állomás' in name or
+            if (flags & _RAILWAY_FLAGS or
                 (station.get('canUseForOfferRequest', False) and 
-                 not ('autóbusz' in name or 'megállóhely' in name))):
+                 not flags & _NON_RAIL_FLAGS)):
                 railway_stations.append(station)
         
         return railway_stations
@@ -160,6 +233,7 @@ class MAVStationLookup:
 
 def main():
     """Demo the station lookup functionality."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     lookup = MAVStationLookup()
     
     # Test searches
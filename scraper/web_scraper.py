@@ -10,13 +10,14 @@ import logging
 import threading
 import time
 from datetime import datetime
-from flask import Flask, request, jsonify
+from flask import Flask, g, request
 from typing import Optional, Dict, Any
 
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from automated_scraper import AutomatedMAVScraper
+from json_utils import dumps_bytes
 
 # Configure logging
 logging.basicConfig(
@@ -31,6 +32,10 @@ BUCKET_NAME = os.environ.get('BUCKET_NAME', 'mpt-all-sources')
 PROJECT_ID = os.environ.get('PROJECT_ID', 'eti-industries')
 CSV_FILE = './scraper/data/route_station_pairs.csv'
 
+# How often the background run publishes per-pair progress to /status
+PROGRESS_UPDATE_EVERY = 25
+PROGRESS_UPDATE_SECONDS = 10.0
+
 # Global variables for tracking scraping status
 scraping_status = {
     'is_running': False,
@@ -51,8 +56,42 @@ scraping_status = {
 }
 scraping_lock = threading.Lock()
 
+# /status serves a snapshot of scraping_status that is only re-copied after a
+# writer changes it; writers set _status_dirty while holding scraping_lock
+_status_snapshot = None
+_status_dirty = True
+
 app = Flask(__name__)
 
+# Shared scraper for health checks; building one sets up a MAVScraper session
+# and the GCS client, which dominated /health latency
+_health_scraper = None
+_health_scraper_lock = threading.Lock()
+
+def _get_health_scraper() -> AutomatedMAVScraper:
+    """Return the shared health-check scraper, creating it on first use."""
+    global _health_scraper
+    with _health_scraper_lock:
+        # Rebuild if the cloud uploader failed to initialize, so a transient
+        # GCS error doesn't turn every later check into a local-only one
+        if _health_scraper is None or (BUCKET_NAME and _health_scraper.uploader is None):
+            _health_scraper = AutomatedMAVScraper(
+                csv_file=CSV_FILE,
+                bucket_name=BUCKET_NAME,
+                project_id=PROJECT_ID
+            )
+        return _health_scraper
+
+@app.before_request
+def _stamp_request():
+    """Read the clock once per request; handlers use g.now / g.now_iso."""
+    g.now = datetime.now()
+    g.now_iso = g.now.isoformat()
+
+def _json_response(payload: Dict[str, Any], status: int = 200):
+    """JSON response encoded via json_utils (orjson when available) instead of jsonify."""
+    return app.response_class(dumps_bytes(payload), status=status, mimetype='application/json')
+
 @app.route('/', methods=['GET', 'POST'])
 def run_scraper():
     """Main endpoint that runs the MAV scraper when triggered."""
@@ -80,19 +119,19 @@ def run_scraper():
             return start_daily_scraping()
         
         else:
-            return jsonify({
+            return _json_response({
                 'status': 'error',
                 'message': f'Unknown action: {action}',
-                'timestamp': datetime.now().isoformat()
-            }), 400
+                'timestamp': g.now_iso
+            }, 400)
     
     except Exception as e:
         logger.error(f" Error in web service: {e}")
-        return jsonify({
+        return _json_response({
             'status': 'error',
             'message': str(e),
-            'timestamp': datetime.now().isoformat()
-        }), 500
+            'timestamp': g.now_iso
+        }, 500)
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -100,21 +139,17 @@ def health_check():
     try:
         logger.info(" Running health check...")
         
-        # Create scraper instance for health check
-        scraper = AutomatedMAVScraper(
-            csv_file=CSV_FILE,
-            bucket_name=BUCKET_NAME,
-            project_id=PROJECT_ID
-        )
+        # Reuse the shared scraper instance for health checks
+        scraper = _get_health_scraper()
         
         # Run health check
         is_healthy = scraper.health_check()
         
         if is_healthy:
-            return jsonify({
+            return _json_response({
                 'status': 'healthy',
                 'message': 'MAV scraper is ready',
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': g.now_iso,
                 'config': {
                     'bucket': BUCKET_NAME,
                     'project': PROJECT_ID,
@@ -122,56 +157,59 @@ def health_check():
                 }
             })
         else:
-            return jsonify({
+            return _json_response({
                 'status': 'unhealthy',
                 'message': 'Health check failed',
-                'timestamp': datetime.now().isoformat()
-            }), 500
+                'timestamp': g.now_iso
+            }, 500)
     
     except Exception as e:
         logger.error(f" Health check failed: {e}")
-        return jsonify({
+        return _json_response({
             'status': 'error',
             'message': f'Health check error: {str(e)}',
-            'timestamp': datetime.now().isoformat()
-        }), 500
+            'timestamp': g.now_iso
+        }, 500)
 
 @app.route('/status', methods=['GET'])
 def get_scraping_status():
     """Get current scraping status."""
-    global scraping_status
+    global scraping_status, _status_snapshot, _status_dirty
     
-    with scraping_lock:
-        current_status = scraping_status.copy()
+    current_status = _status_snapshot
+    if _status_dirty or current_status is None:
+        with scraping_lock:
+            current_status = _status_snapshot = scraping_status.copy()
+            _status_dirty = False
     
-    # Calculate duration if running
+    # Calculate duration if running (on a copy; the snapshot is shared)
     if current_status['is_running'] and current_status['start_time']:
-        duration = (datetime.now() - current_status['start_time']).total_seconds()
-        current_status['duration_seconds'] = duration
+        duration = (g.now - current_status['start_time']).total_seconds()
+        current_status = dict(current_status, duration_seconds=duration)
     
-    return jsonify({
+    return _json_response({
         'status': 'success',
         'scraping_status': current_status,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': g.now_iso
     })
 
 def start_daily_scraping():
     """Start the daily scraping process asynchronously."""
-    global scraping_status
+    global scraping_status, _status_dirty
     
     with scraping_lock:
         if scraping_status['is_running']:
-            return jsonify({
+            return _json_response({
                 'status': 'error',
                 'message': 'Scraping is already running',
                 'scraping_status': scraping_status,
-                'timestamp': datetime.now().isoformat()
-            }), 409
+                'timestamp': g.now_iso
+            }, 409)
         
         # Reset status
         scraping_status.update({
             'is_running': True,
-            'start_time': datetime.now(),
+            'start_time': g.now,
             'end_time': None,
             'progress': 0,
             'total': 0,
@@ -186,6 +224,7 @@ def start_daily_scraping():
                 'upload_errors': 0
             }
         })
+        _status_dirty = True
     
     # Start scraping in background thread
     thread = threading.Thread(target=run_daily_scraping_background, daemon=True)
@@ -193,17 +232,17 @@ def start_daily_scraping():
     
     logger.info(" Daily scraping started in background thread")
     
-    return jsonify({
+    return _json_response({
         'status': 'success',
         'message': 'Daily scraping started successfully in background',
         'scraping_status': scraping_status,
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': g.now_iso,
         'instructions': 'Use GET /status to check progress'
     })
 
 def run_daily_scraping_background():
     """Run the daily scraping process in background."""
-    global scraping_status
+    global scraping_status, _status_dirty
     
     try:
         start_time = datetime.now()
@@ -215,6 +254,7 @@ def run_daily_scraping_background():
                 'status': 'running',
                 'message': 'Creating scraper instance...'
             })
+            _status_dirty = True
         
         # Create scraper instance
         scraper = AutomatedMAVScraper(
@@ -229,16 +269,31 @@ def run_daily_scraping_background():
                 'total': 966,  # Default estimate, will be updated when scraping starts
                 'message': 'Initializing bulk scraper...'
             })
+            _status_dirty = True
         
         # Custom progress tracking
         original_process_pair = scraper.bulk_scraper.process_pair
         
+        # Publish progress every PROGRESS_UPDATE_EVERY pairs or at most
+        # PROGRESS_UPDATE_SECONDS apart, not on every pair
+        last_update = time.monotonic()
+        
         def tracked_process_pair(*args, **kwargs):
+            global _status_dirty
+            nonlocal last_update
             result = original_process_pair(*args, **kwargs)
+            
+            stats = scraper.bulk_scraper.stats
+            processed = stats.get('processed', 0)
+            now = time.monotonic()
+            if processed % PROGRESS_UPDATE_EVERY and now - last_update < PROGRESS_UPDATE_SECONDS:
+                return result
+            last_update = now
+            
             with scraping_lock:
                 # Update progress and total count from bulk scraper stats
-                scraping_status['progress'] = scraper.bulk_scraper.stats.get('processed', 0)
-                total_pairs = scraper.bulk_scraper.stats.get('total_pairs', scraping_status['total'])
+                scraping_status['progress'] = processed
+                total_pairs = stats.get('total_pairs', scraping_status['total'])
                 if total_pairs != scraping_status['total']:
                     scraping_status['total'] = total_pairs
                 
@@ -253,6 +308,7 @@ def run_daily_scraping_background():
                     # Update upload stats in real-time if available
                     if hasattr(scraper, 'upload_stats'):
                         scraping_status['upload_stats'] = scraper.upload_stats.copy()
+                _status_dirty = True
             return result
         
         # Monkey patch for progress tracking
@@ -287,6 +343,7 @@ def run_daily_scraping_background():
                 'progress': scraper.bulk_scraper.stats.get('processed', 0),
                 'upload_stats': upload_stats
             })
+            _status_dirty = True
         
         if success:
             logger.info(f" Daily scraping completed successfully in {duration}")
@@ -303,17 +360,14 @@ def run_daily_scraping_background():
                 'message': f'Scraping failed with error: {str(e)}',
                 'last_error': str(e)
             })
+            _status_dirty = True
 
 if __name__ == '__main__':
     logger.info(" Starting MAV Scraper Web Service")
     
     # Health check on startup
     try:
-        scraper = AutomatedMAVScraper(
-            csv_file=CSV_FILE,
-            bucket_name=BUCKET_NAME,
-            project_id=PROJECT_ID
-        )
+        scraper = _get_health_scraper()
         if scraper.health_check():
             logger.info(" Startup health check passed")
         else:
@@ -323,4 +377,6 @@ if __name__ == '__main__':
     
     # Start Flask app
     port = int(os.environ.get('PORT', 8080))
-    app.run(host='0.0.0.0', port=port, debug=False) 
\ No newline at end of file
+    # Threaded so /status polls don't queue behind each other (single process:
+    # scraping_status is process-local)
+    app.run(host='0.0.0.0', port=port, debug=False, threaded=True) 
\ No newline at end of file
@@ -8,21 +8,235 @@ Fetches Hungarian railway stations from multiple sources including:
 - MAV website scraping (where possible)
 """
 
+import hashlib
 import json
 import requests
+import sqlite3
+import tempfile
 import time
+from contextlib import closing
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import logging
 import csv
+import re
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from urllib.parse import quote
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _json_loads(content: bytes) -> Any:
+    """Parse a JSON response body (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def _write_json(path, data: Any, sort_keys: bool = False) -> None:
+    """Write data as 2-space indented UTF-8 JSON (same layout with or without orjson)."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=option))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=sort_keys)
+
+def _write_csv(path, stations: List[Dict[str, Any]]) -> None:
+    """Write the flat station CSV (header only when there are stations)."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if stations:
+            fieldnames = ['id', 'name', 'city', 'country', 'operator', 'source', 'latitude', 'longitude']
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            
+            # Plain tuples in fieldnames order, written in one writerows
+            # call (no per-row dict for DictWriter to unpack again)
+            def rows():
+                for station in stations:
+                    coords = station.get('coordinates', {}) or {}
+                    yield (
+                        station.get('id', ''),
+                        station.get('name', ''),
+                        station.get('city', ''),
+                        station.get('country', ''),
+                        station.get('operator', ''),
+                        station.get('source', ''),
+                        coords.get('latitude', ''),
+                        coords.get('longitude', '')
+                    )
+            
+            writer.writerows(rows())
+
+# OSM tags kept under 'raw_tags'; everything else used is already copied into
+# its own field, and keeping the whole tag dict pins the Overpass response in memory
+_RAW_TAG_KEYS = ('name:de', 'name:sk', 'network', 'wheelchair')
+
+# Wikidata WKT literal, e.g. "Point(19.0833 47.5)" (longitude first)
+_POINT_RE = re.compile(r'Point\((\S+) (\S+)\)')
+
+_RAIL_TRANSPORT_MODE = {
+    'code': 100,
+    'name': 'Rail',
+    'description': 'Rail. Used for intercity or long-distance travel.'
+}
+
+# Major MAV stations, built once at import; the nested transportMode and alias
+# lists are shared here, so get_known_mav_stations copies them per call
+_KNOWN_STATIONS = tuple(
+    {
+        **station,
+        'transportMode': _RAIL_TRANSPORT_MODE,
+        'canUseForOfferRequest': True,
+        'canUseForPassengerInformation': True
+    }
+    for station in [
+        {
+            'id': '005510009',
+            'name': 'BUDAPEST*',
+            'aliasNames': ['Bp (BUDAPEST*)', 'Budapest', 'Budapest Central'],
+            'type': 'station',
+            'country': 'Hungary',
+            'countryIso': 'HU',
+            'city': 'Budapest',
+            'isInternational': True,
+            'operator': 'MÁV',
+            'source': 'known_stations',
+            'major_hub': True
+        },
+        {
+            'id': '005513005',
+            'name': 'BUDAPEST-KELETI',
+            'aliasNames': ['Budapest Keleti', 'Budapest East', 'Keleti pu.'],
+            'type': 'station',
+            'country': 'Hungary',
+            'countryIso': 'HU',
+            'city': 'Budapest',
+            'isInternational': True,
+            'operator': 'MÁV',
+            'source': 'known_stations',
+            'major_hub': True
+        },
+        {
+            'id': '005513006',
+            'name': 'BUDAPEST-NYUGATI',
+            'aliasNames': ['Budapest Nyugati', 'Budapest West', 'Nyugati pu.'],
+            'type': 'station',
+            'country': 'Hungary',
+            'countryIso': 'HU',
+            'city': 'Budapest',
+            'isInternational': True,
+            'operator': 'MÁV',
+            'source': 'known_stations',
+            'major_hub': True
+        },
+        {
+            'id': '005513007',
+            'name': 'BUDAPEST-DÉLI',
+            'aliasNames': ['Budapest Déli', 'Budapest South', 'Déli pu.'],
+            'type': 'station',
+            'country': 'Hungary',
+            'countryIso': 'HU',
+            'city': 'Budapest',
+            'isInternational': False,
+            'operator': 'MÁV',
+            'source': 'known_stations',
+            'major_hub': True
+        },
+        {
+            'id': '005516001',
+            'name': 'DEBRECEN',
+            'type': 'station',
+            'country': 'Hungary',
+            'countryIso': 'HU',
+            'city': 'Debrecen',
+            'isInternational': True,
+            'operator': 'MÁV',
+            'source': 'known_stations',
+            'major_hub': True
+        },
+        {
+            'id': '005517001',
+            'name': 'SZEGED',
+            'type': 'station',
+            'country': 'Hungary',
+            'countryIso': 'HU',
+            'city': 'Szeged',
+            'isInternational': False,
+            'operator': 'MÁV',
+            'source': 'known_stations',
+            'major_hub': True
+        },
+        {
+            'id': '005518001',
+            'name': 'PÉCS',
+            'type': 'station',
+            'country': 'Hungary',
+            'countryIso': 'HU',
+            'city': 'Pécs',
+            'isInternational': False,
+            'operator': 'MÁV',
+            'source': 'known_stations',
+            'major_hub': True
+        },
+        {
+            'id': '005519001',
+            'name': 'GYŐR',
+            'type': 'station',
+            'country': 'Hungary',
+            'countryIso': 'HU',
+            'city': 'Győr',
+            'isInternational': True,
+            'operator': 'MÁV',
+            'source': 'known_stations',
+            'major_hub': True
+        },
+        {
+            'id': '005520001',
+            'name': 'SZOLNOK',
+            'type': 'station',
+            'country': 'Hungary',
+            'countryIso': 'HU',
+            'city': 'Szolnok',
+            'isInternational': False,
+            'operator': 'MÁV',
+            'source': 'known_stations',
+            'major_hub': True
+        },
+        {
+            'id': '005521001',
+            'name': 'MISKOLC',
+            'type': 'station',
+            'country': 'Hungary',
+            'countryIso': 'HU',
+            'city': 'Miskolc',
+            'isInternational': False,
+            'operator': 'MÁV',
+            'source': 'known_stations',
+            'major_hub': True
+        }
+    ]
+)
+
 class ComprehensiveMAVFetcher:
-    def __init__(self):
+    def __init__(self, cache_ttl: int = 86400, cache_path: Optional[str] = None):
+        """
+        Args:
+            cache_ttl: Seconds to reuse cached Overpass/Wikidata responses (0 disables the cache)
+            cache_path: SQLite cache file (defaults to one in the system temp directory)
+        """
+        self.cache_ttl = cache_ttl
+        self.cache_path = cache_path or str(Path(tempfile.gettempdir()) / "mav_stations_fetch_cache.sqlite3")
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'MAV-Stations-Fetcher/1.0 (https://github.com/user/project)',
@@ -31,6 +245,42 @@ class ComprehensiveMAVFetcher:
         })
         self.stations = []
         self.seen_ids = set()
+    
+    def _cached_request(self, method: str, url: str, **kwargs) -> Optional[bytes]:
+        """
+        Body of a successful (200) response, served from the SQLite cache while
+        younger than cache_ttl. Station data changes weekly at most, so repeat
+        runs don't need to hit Overpass/Wikidata again. Returns None on a non-200.
+        """
+        if self.cache_ttl <= 0:
+            response = self.session.request(method, url, **kwargs)
+            return response.content if response.status_code == 200 else None
+        
+        request_key = repr((method, url, kwargs.get('data'), kwargs.get('params')))
+        key = hashlib.sha1(request_key.encode('utf-8')).hexdigest()
+        now = int(time.time())
+        
+        try:
+            with closing(sqlite3.connect(self.cache_path)) as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, ts INTEGER, body BLOB)")
+                row = conn.execute("SELECT ts, body FROM cache WHERE key = ?", (key,)).fetchone()
+            if row and now - row[0] < self.cache_ttl:
+                logger.info(f"Using cached response for {url}")
+                return row[1]
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache unavailable: {e}")
+        
+        response = self.session.request(method, url, **kwargs)
+        if response.status_code != 200:
+            return None
+        
+        try:
+            with closing(sqlite3.connect(self.cache_path)) as conn, conn:
+                conn.execute("INSERT OR REPLACE INTO cache (key, ts, body) VALUES (?, ?, ?)",
+                             (key, now, response.content))
+        except sqlite3.Error as e:
+            logger.warning(f"Could not cache response: {e}")
+        return response.content
         
     def fetch_from_overpass(self) -> List[Dict[str, Any]]:
         """
@@ -52,10 +302,10 @@ class ComprehensiveMAVFetcher:
         
         try:
             url = "https://overpass-api.de/api/interpreter"
-            response = self.session.post(url, data=overpass_query, timeout=60)
+            body = self._cached_request('POST', url, data=overpass_query, timeout=60)
             
-            if response.status_code == 200:
-                data = response.json()
+            if body is not None:
+                data = _json_loads(body)
                 stations = []
                 
                 for element in data.get('elements', []):
@@ -81,7 +331,7 @@ class ComprehensiveMAVFetcher:
                             'wikidata': tags.get('wikidata', ''),
                             'ref': tags.get('ref', ''),
                             'uic_ref': tags.get('uic_ref', ''),
-                            'raw_tags': tags
+                            'raw_tags': {k: tags[k] for k in _RAW_TAG_KEYS if k in tags}
                         }
                         stations.append(station)
                 
@@ -95,9 +345,10 @@ class ComprehensiveMAVFetcher:
     
     def _extract_coordinates(self, element: Dict) -> Optional[Dict[str, float]]:
         """Extract coordinates from OSM element"""
-        if 'lat' in element and 'lon' in element:
+        lat = element.get('lat')
+        if lat is not None and 'lon' in element:
             return {
-                'latitude': float(element['lat']),
+                'latitude': float(lat),
                 'longitude': float(element['lon'])
             }
         elif 'center' in element:
@@ -118,22 +369,38 @@ class ComprehensiveMAVFetcher:
           ?station wdt:P31/wdt:P279* wd:Q55488 .  # railway station
           ?station wdt:P17 wd:Q28 .                # country: Hungary
           OPTIONAL { ?station wdt:P625 ?coord }
-          OPTIONAL { ?station wdt:P131 ?city }
-          OPTIONAL { ?station wdt:P137 ?operator }
           OPTIONAL { ?station wdt:P954 ?uicCode }
-          SERVICE wikibase:label { bd:serviceParam wikibase:language "hu,en" }
+          # Labels read directly (Hungarian first, then English) instead of via
+          # the wikibase:label service, which is one of the slowest parts of a WDQS query.
+          # City/operator labels are nested in the OPTIONAL that binds their subject:
+          # at top level an unbound ?city/?operator would join with every label.
+          OPTIONAL { ?station rdfs:label ?stationHu FILTER(LANG(?stationHu) = "hu") }
+          OPTIONAL { ?station rdfs:label ?stationEn FILTER(LANG(?stationEn) = "en") }
+          OPTIONAL {
+            ?station wdt:P131 ?city .
+            OPTIONAL { ?city rdfs:label ?cityHu FILTER(LANG(?cityHu) = "hu") }
+            OPTIONAL { ?city rdfs:label ?cityEn FILTER(LANG(?cityEn) = "en") }
+          }
+          OPTIONAL {
+            ?station wdt:P137 ?operator .
+            OPTIONAL { ?operator rdfs:label ?operatorHu FILTER(LANG(?operatorHu) = "hu") }
+            OPTIONAL { ?operator rdfs:label ?operatorEn FILTER(LANG(?operatorEn) = "en") }
+          }
+          BIND(COALESCE(?stationHu, ?stationEn, STRAFTER(STR(?station), "entity/")) AS ?stationLabel)
+          BIND(COALESCE(?cityHu, ?cityEn, STRAFTER(STR(?city), "entity/")) AS ?cityLabel)
+          BIND(COALESCE(?operatorHu, ?operatorEn, STRAFTER(STR(?operator), "entity/")) AS ?operatorLabel)
         }
         """
         
         try:
             url = "https://query.wikidata.org/sparql"
-            response = self.session.get(url, params={
+            body = self._cached_request('GET', url, params={
                 'query': sparql_query,
                 'format': 'json'
-            }, timeout=30)
+            }, headers={'Accept': 'application/sparql-results+json'}, timeout=30)
             
-            if response.status_code == 200:
-                data = response.json()
+            if body is not None:
+                data = _json_loads(body)
                 stations = []
                 
                 for binding in data.get('results', {}).get('bindings', []):
@@ -166,14 +433,14 @@ class ComprehensiveMAVFetcher:
     
     def _parse_wikidata_coords(self, coord_string: str) -> Optional[Dict[str, float]]:
         """Parse Wikidata coordinate string"""
-        if coord_string and coord_string.startswith('Point('):
+        match = _POINT_RE.match(coord_string) if coord_string else None
+        if match:
             try:
-                coords = coord_string.replace('Point(', '').replace(')', '').split()
                 return {
-                    'longitude': float(coords[0]),
-                    'latitude': float(coords[1])
+                    'longitude': float(match.group(1)),
+                    'latitude': float(match.group(2))
                 }
-            except (ValueError, IndexError):
+            except ValueError:
                 pass
         return None
     
@@ -183,142 +450,14 @@ class ComprehensiveMAVFetcher:
         """
         logger.info("Adding known MAV stations...")
         
-        known_stations = [
-            {
-                'id': '005510009',
-                'name': 'BUDAPEST*',
-                'aliasNames': ['Bp (BUDAPEST*)', 'Budapest', 'Budapest Central'],
-                'type': 'station',
-                'country': 'Hungary',
-                'countryIso': 'HU',
-                'city': 'Budapest',
-                'isInternational': True,
-                'operator': 'MÁV',
-                'source': 'known_stations',
-                'major_hub': True
-            },
-            {
-                'id': '005513005',
-                'name': 'BUDAPEST-KELETI',
-                'aliasNames': ['Budapest Keleti', 'Budapest East', 'Keleti pu.'],
-                'type': 'station',
-                'country': 'Hungary',
-                'countryIso': 'HU',
-                'city': 'Budapest',
-                'isInternational': True,
-                'operator': 'MÁV',
-                'source': 'known_stations',
-                'major_hub': True
-            },
-            {
-                'id': '005513006',
-                'name': 'BUDAPEST-NYUGATI',
-                'aliasNames': ['Budapest Nyugati', 'Budapest West', 'Nyugati pu.'],
-                'type': 'station',
-                'country': 'Hungary',
-                'countryIso': 'HU',
-                'city': 'Budapest',
-                'isInternational': True,
-                'operator': 'MÁV',
-                'source': 'known_stations',
-                'major_hub': True
-            },
-            {
-                'id': '005513007',
-                'name': 'BUDAPEST-DÉLI',
-                'aliasNames': ['Budapest Déli', 'Budapest South', 'Déli pu.'],
-                'type': 'station',
-                'country': 'Hungary',
-                'countryIso': 'HU',
-                'city': 'Budapest',
-                'isInternational': False,
-                'operator': 'MÁV',
-                'source': 'known_stations',
-                'major_hub': True
-            },
-            {
-                'id': '005516001',
-                'name': 'DEBRECEN',
-                'type': 'station',
-                'country': 'Hungary',
-                'countryIso': 'HU',
-                'city': 'Debrecen',
-                'isInternational': True,
-                'operator': 'MÁV',
-                'source': 'known_stations',
-                'major_hub': True
-            },
-            {
-                'id': '005517001',
-                'name': 'SZEGED',
-                'type': 'station',
-                'country': 'Hungary',
-                'countryIso': 'HU',
-                'city': 'Szeged',
-                'isInternational': False,
-                'operator': 'MÁV',
-                'source': 'known_stations',
-                'major_hub': True
-            },
-            {
-                'id': '005518001',
-                'name': 'PÉCS',
-                'type': 'station',
-                'country': 'Hungary',
-                'countryIso': 'HU',
-                'city': 'Pécs',
-                'isInternational': False,
-                'operator': 'MÁV',
-                'source': 'known_stations',
-                'major_hub': True
-            },
-            {
-                'id': '005519001',
-                'name': 'GYŐR',
-                'type': 'station',
-                'country': 'Hungary',
-                'countryIso': 'HU',
-                'city': 'Győr',
-                'isInternational': True,
-                'operator': 'MÁV',
-                'source': 'known_stations',
-                'major_hub': True
-            },
-            {
-                'id': '005520001',
-                'name': 'SZOLNOK',
-                'type': 'station',
-                'country': 'Hungary',
-                'countryIso': 'HU',
-                'city': 'Szolnok',
-                'isInternational': False,
-                'operator': 'MÁV',
-                'source': 'known_stations',
-                'major_hub': True
-            },
-            {
-                'id': '005521001',
-                'name': 'MISKOLC',
-                'type': 'station',
-                'country': 'Hungary',
-                'countryIso': 'HU',
-                'city': 'Miskolc',
-                'isInternational': False,
-                'operator': 'MÁV',
-                'source': 'known_stations',
-                'major_hub': True
-            }
-        ]
-        
-        # Add transport mode to all stations
-        for station in known_stations:
-            station['transportMode'] = {
-                'code': 100,
-                'name': 'Rail',
-                'description': 'Rail. Used for intercity or long-distance travel.'
-            }
-            station['canUseForOfferRequest'] = True
-            station['canUseForPassengerInformation'] = True
+        # Per-call copies of each station and its only mutable values, so callers
+        # can't modify the module-level table (cheaper than a deepcopy)
+        known_stations = []
+        for station in _KNOWN_STATIONS:
+            entry = {**station, 'transportMode': dict(_RAIL_TRANSPORT_MODE)}
+            if 'aliasNames' in station:
+                entry['aliasNames'] = list(station['aliasNames'])
+            known_stations.append(entry)
         
         logger.info(f"Added {len(known_stations)} known MAV stations")
         return known_stations
@@ -330,35 +469,46 @@ class ComprehensiveMAVFetcher:
         merged = []
         seen_names = set()
         seen_coords = set()
+        # Shared identifiers ('uic', uic_ref) / ('wikidata', Q-id): the same
+        # station can appear under differently spelled names across sources
+        seen_refs = set()
+        # Bound once for the loop
+        add_name = seen_names.add
+        add_coord = seen_coords.add
+        add_ref = seen_refs.add
+        append = merged.append
         
         for station_list in station_lists:
             for station in station_list:
                 # Check for duplicates by name and coordinates
-                name_key = station.get('name', '').lower().strip()
+                name_key = (station.get('name') or '').lower().strip()
                 coords = station.get('coordinates')
                 coord_key = None
-                if coords and coords.get('latitude') and coords.get('longitude'):
-                    # Round coordinates to avoid floating point precision issues
-                    coord_key = (round(coords['latitude'], 4), round(coords['longitude'], 4))
-                
-                is_duplicate = False
+                if coords:
+                    lat = coords.get('latitude')
+                    lon = coords.get('longitude')
+                    if lat and lon:
+                        # Round coordinates to avoid floating point precision issues
+                        coord_key = (round(lat, 4), round(lon, 4))
+                uic_key = ('uic', station.get('uic_ref')) if station.get('uic_ref') else None
+                wikidata_key = ('wikidata', station.get('wikidata')) if station.get('wikidata') else None
                 
-                # Check for name duplicates
-                if name_key and name_key in seen_names:
-                    is_duplicate = True
+                # Empty names, missing coordinates and missing ids are never added
+                # to the seen sets, so they can't produce a false duplicate here
+                if (name_key in seen_names or coord_key in seen_coords
+                        or uic_key in seen_refs or wikidata_key in seen_refs):
+                    logger.debug("Skipping duplicate station: %s", station.get('name'))
+                    continue
                 
-                # Check for coordinate duplicates (if coordinates exist)
-                if coord_key and coord_key in seen_coords:
-                    is_duplicate = True
-                
-                if not is_duplicate:
-                    merged.append(station)
-                    if name_key:
-                        seen_names.add(name_key)
-                    if coord_key:
-                        seen_coords.add(coord_key)
-                else:
-                    logger.debug(f"Skipping duplicate station: {station.get('name')}")
+                append(station)
+                if name_key:
+                    add_name(name_key)
+                if coord_key:
+                    add_coord(coord_key)
+                if uic_key:
+                    add_ref(uic_key)
+                if wikidata_key:
+                    add_ref(wikidata_key)
         
         return merged
     
@@ -370,44 +520,25 @@ class ComprehensiveMAVFetcher:
             output_path = Path(output_file)
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Save complete JSON data
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(stations, f, ensure_ascii=False, indent=2, sort_keys=True)
-            
-            # Save CSV format
-            csv_path = output_path.with_suffix('.csv')
-            with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-                if stations:
-                    fieldnames = ['id', 'name', 'city', 'country', 'operator', 'source', 'latitude', 'longitude']
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-                    writer.writeheader()
-                    
-                    for station in stations:
-                        coords = station.get('coordinates', {}) or {}
-                        row = {
-                            'id': station.get('id', ''),
-                            'name': station.get('name', ''),
-                            'city': station.get('city', ''),
-                            'country': station.get('country', ''),
-                            'operator': station.get('operator', ''),
-                            'source': station.get('source', ''),
-                            'latitude': coords.get('latitude', ''),
-                            'longitude': coords.get('longitude', '')
-                        }
-                        writer.writerow(row)
-            
-            # Create summary
+            # Create summary (all counts in one pass over the stations)
             sources = {}
+            major_hubs = international = with_coordinates = 0
             for station in stations:
                 source = station.get('source', 'unknown')
                 sources[source] = sources.get(source, 0) + 1
+                if station.get('major_hub', False):
+                    major_hubs += 1
+                if station.get('isInternational', False):
+                    international += 1
+                if station.get('coordinates'):
+                    with_coordinates += 1
             
             summary = {
                 'total_stations': len(stations),
                 'sources': sources,
-                'major_hubs': len([s for s in stations if s.get('major_hub', False)]),
-                'international_stations': len([s for s in stations if s.get('isInternational', False)]),
-                'stations_with_coordinates': len([s for s in stations if s.get('coordinates')]),
+                'major_hubs': major_hubs,
+                'international_stations': international,
+                'stations_with_coordinates': with_coordinates,
                 'generated_at': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
                 'data_sources': [
                     'OpenStreetMap (via Overpass API)',
@@ -417,9 +548,12 @@ class ComprehensiveMAVFetcher:
                 'sample_stations': stations[:10] if stations else []
             }
             
+            csv_path = output_path.with_suffix('.csv')
             summary_path = output_path.parent / f"{output_path.stem}_summary.json"
-            with open(summary_path, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, ensure_ascii=False, indent=2)
+            
+            _write_json(output_path, stations, sort_keys=True)
+            _write_csv(csv_path, stations)
+            _write_json(summary_path, summary)
             
             logger.info(f"Successfully saved {len(stations)} stations to {output_path}")
             logger.info(f"CSV format saved to {csv_path}")
@@ -436,16 +570,21 @@ class ComprehensiveMAVFetcher:
         
         all_station_lists = []
         
-        # Fetch from multiple sources
+        # Fetch from multiple sources - both are network-bound, so query them
+        # concurrently and collect in a fixed order (merge priority: OSM first)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            osm_future = executor.submit(self.fetch_from_overpass)
+            wikidata_future = executor.submit(self.fetch_from_wikidata)
+        
         try:
-            osm_stations = self.fetch_from_overpass()
+            osm_stations = osm_future.result()
             if osm_stations:
                 all_station_lists.append(osm_stations)
         except Exception as e:
             logger.error(f"OSM fetch failed: {e}")
         
         try:
-            wikidata_stations = self.fetch_from_wikidata()
+            wikidata_stations = wikidata_future.result()
             if wikidata_stations:
                 all_station_lists.append(wikidata_stations)
         except Exception as e:
@@ -459,8 +598,8 @@ class ComprehensiveMAVFetcher:
         if all_station_lists:
             merged_stations = self.merge_stations(*all_station_lists)
             
-            # Sort by name
-            merged_stations.sort(key=lambda x: x.get('name', ''))
+            # Sort by name (every source sets 'name' to a string)
+            merged_stations.sort(key=itemgetter('name'))
             
             # Save data
             self.save_stations_data(merged_stations, output_file)
@@ -6,18 +6,96 @@ Similar to the martinlangbecker/mav-stations Node.js package
 """
 
 import json
+import random
 import requests
+import sqlite3
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from requests.adapters import HTTPAdapter
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import logging
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Concurrent search-term requests in _fetch_via_search (also the pool size)
+SEARCH_WORKERS = 8
+# Concurrent fetch_station_details calls in fetch_all_stations(include_details=True)
+DETAIL_WORKERS = 8
+
+def _rail_transport_mode() -> Dict[str, Any]:
+    """Default transportMode for stations that don't carry one (a fresh dict per station)."""
+    return {
+        'code': 100,
+        'name': 'Rail',
+        'description': 'Rail. Used for intercity or long-distance travel.'
+    }
+
+# _normalize_station_data output fields in order: (key, source aliases tried in
+# order, default); a callable default is called per station so it isn't shared.
+# 'coordinates' is only a placeholder here, filled from COORD_KEYS.
+FIELD_SPEC = (
+    ('type', (), 'station'),
+    ('id', ('id', 'stationId'), ''),
+    ('name', ('name', 'stationName'), ''),
+    ('aliasNames', ('aliasNames', 'aliases'), list),
+    ('baseCode', ('baseCode', 'code'), ''),
+    ('isInternational', ('isInternational',), False),
+    ('canUseForOfferRequest', ('canUseForOfferRequest',), True),
+    ('canUseForPassengerInformation', ('canUseForPassengerInformation',), False),
+    ('country', ('country',), 'Hungary'),
+    ('countryIso', ('countryIso',), 'HU'),
+    ('isIn108_1', ('isIn108_1', 'internationalCapable'), False),
+    ('transportMode', ('transportMode',), _rail_transport_mode),
+    ('coordinates', (), None),
+    ('address', ('address',), ''),
+    ('city', ('city',), ''),
+    ('region', ('region',), ''),
+    ('postalCode', ('postalCode',), ''),
+)
+COORD_KEYS = (
+    ('latitude', ('latitude', 'lat')),
+    ('longitude', ('longitude', 'lon', 'lng')),
+)
+
+# Responses worth retrying (rate limited / gateway trouble) in _get_with_retry
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+def _write_json(path, data: Any, sort_keys: bool = False, pretty: bool = True) -> None:
+    """Write data as UTF-8 JSON, 2-space indented or compact (same layout with or without orjson)."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=option))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            if pretty:
+                json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=sort_keys)
+            else:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'), sort_keys=sort_keys)
+
 class MAVStationsFetcher:
-    def __init__(self):
+    def __init__(self, details_ttl: int = 7 * 86400, cache_path: Optional[str] = None):
+        """
+        Args:
+            details_ttl: Seconds to reuse cached station details (0 disables the cache)
+            cache_path: SQLite cache file (defaults to one in the system temp directory)
+        """
+        self.details_ttl = details_ttl
+        self.cache_path = cache_path or str(Path(tempfile.gettempdir()) / "mav_stations_details_cache.sqlite3")
         self.base_url = "https://jegy.mav.hu"
         self.stations_endpoint = "/api/v1/stations"
         self.session = requests.Session()
@@ -27,6 +105,47 @@ class MAVStationsFetcher:
             'Accept-Language': 'en-US,en;q=0.9,hu;q=0.8',
             'Referer': 'https://jegy.mav.hu'
         })
+        # Enough pooled connections for every worker to keep its own alive
+        adapter = HTTPAdapter(pool_maxsize=max(SEARCH_WORKERS, DETAIL_WORKERS))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def _get_with_retry(self, url: str, timeout: float = 15, max_attempts: int = 4,
+                        base: float = 0.5, cap: float = 15.0,
+                        stop: Optional[threading.Event] = None) -> requests.Response:
+        """
+        GET with full-jitter exponential backoff on transient failures
+        (RETRY_STATUSES or a RequestException). Honors a numeric Retry-After.
+        Gives up early once stop is set (checked during each backoff).
+        Returns the last response, or re-raises the last RequestException.
+        """
+        for attempt in range(max_attempts):
+            last_attempt = attempt == max_attempts - 1
+            delay = random.random() * min(base * 2 ** attempt, cap)
+            error = None
+            try:
+                response = self.session.get(url, timeout=timeout)
+            except requests.RequestException as e:
+                if last_attempt:
+                    raise
+                error = e
+            else:
+                if response.status_code not in RETRY_STATUSES or last_attempt:
+                    return response
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    delay = min(float(retry_after), cap)
+            
+            logger.debug(f"Retrying {url} in {delay:.2f}s (attempt {attempt + 1}/{max_attempts})")
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                logger.debug(f"Stopped retrying {url}")
+                break
+        
+        if error is not None:
+            raise error
+        return response
         
     def fetch_stations_list(self) -> List[Dict[str, Any]]:
         """
@@ -44,30 +163,25 @@ class MAVStationsFetcher:
                 f"{self.base_url}/api/locations"
             ]
             
-            for endpoint in endpoints_to_try:
-                try:
-                    logger.info(f"Trying endpoint: {endpoint}")
-                    response = self.session.get(endpoint, timeout=30)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        if isinstance(data, list) and len(data) > 0:
-                            logger.info(f"Successfully fetched {len(data)} stations from {endpoint}")
-                            return data
-                        elif isinstance(data, dict) and 'stations' in data:
-                            stations = data['stations']
-                            logger.info(f"Successfully fetched {len(stations)} stations from {endpoint}")
-                            return stations
-                        elif isinstance(data, dict) and 'data' in data:
-                            stations = data['data']
+            # Query every endpoint at once and take the first usable answer, so
+            # discovery costs the fastest endpoint's latency, not the sum of all
+            stop = threading.Event()
+            executor = ThreadPoolExecutor(max_workers=len(endpoints_to_try))
+            try:
+                futures = [executor.submit(self._fetch_endpoint, endpoint, stop)
+                           for endpoint in endpoints_to_try]
+                for _ in as_completed(futures):
+                    # If several have answered by now, the earliest in the list wins
+                    for endpoint, future in zip(endpoints_to_try, futures):
+                        if future.done() and future.result() is not None:
+                            stations = future.result()
                             logger.info(f"Successfully fetched {len(stations)} stations from {endpoint}")
                             return stations
-                    
-                except requests.RequestException as e:
-                    logger.debug(f"Failed to fetch from {endpoint}: {e}")
-                    continue
-                    
-                time.sleep(1)  # Rate limiting
+            finally:
+                # Don't wait on the slower endpoints once one has answered, and
+                # tell them to stop retrying
+                stop.set()
+                executor.shutdown(wait=False)
             
             # If API endpoints fail, try scraping approach
             logger.warning("API endpoints failed, trying alternative approach...")
@@ -77,12 +191,35 @@ class MAVStationsFetcher:
             logger.error(f"Error fetching stations: {e}")
             return []
     
+    def _fetch_endpoint(self, endpoint: str,
+                        stop: Optional[threading.Event] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Stations list from one candidate endpoint, or None if it has none
+        """
+        try:
+            logger.info(f"Trying endpoint: {endpoint}")
+            response = self._get_with_retry(endpoint, timeout=30, stop=stop)
+            
+            if response.status_code == 200:
+                data = response.json()
+                if isinstance(data, list) and len(data) > 0:
+                    return data
+                elif isinstance(data, dict) and 'stations' in data:
+                    return data['stations']
+                elif isinstance(data, dict) and 'data' in data:
+                    return data['data']
+            
+        except (requests.RequestException, ValueError) as e:
+            logger.debug(f"Failed to fetch from {endpoint}: {e}")
+        
+        return None
+    
     def _fetch_via_search(self) -> List[Dict[str, Any]]:
         """
         Alternative method: fetch stations by searching with common letters
         """
-        stations = []
-        seen_ids = set()
+        # Normalized stations by id; insertion order keeps the first-seen order
+        stations_by_id = {}
         
         # Hungarian alphabet and common search terms
         search_terms = [
@@ -91,87 +228,125 @@ class MAVStationsFetcher:
             'bu', 'de', 'sz', 'pe', 'ke', 'ba', 'ta', 'va', 'za', 'ny'
         ]
         
-        for term in search_terms:
+        # Terms are independent and network-bound: probe them concurrently over
+        # the shared session (max_workers caps the request rate), then merge in
+        # term order so the result matches a sequential run
+        with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as executor:
+            results = list(executor.map(self._search_term, search_terms))
+        
+        for term, search_results in zip(search_terms, results):
             try:
-                logger.info(f"Searching for stations starting with '{term}'...")
-                
-                search_endpoints = [
-                    f"{self.base_url}/api/v1/stations/search?q={term}",
-                    f"{self.base_url}/api/stations/search?query={term}",
-                    f"{self.base_url}/api/search/stations?term={term}"
-                ]
-                
-                for endpoint in search_endpoints:
-                    try:
-                        response = self.session.get(endpoint, timeout=15)
-                        if response.status_code == 200:
-                            data = response.json()
-                            
-                            if isinstance(data, list):
-                                search_results = data
-                            elif isinstance(data, dict):
-                                search_results = data.get('stations', data.get('results', data.get('data', [])))
-                            else:
-                                continue
-                            
-                            for station in search_results:
-                                station_id = station.get('id') or station.get('stationId')
-                                if station_id and station_id not in seen_ids:
-                                    seen_ids.add(station_id)
-                                    stations.append(self._normalize_station_data(station))
-                            
-                            if search_results:
-                                logger.info(f"Found {len(search_results)} stations for '{term}'")
-                                break
-                                
-                    except requests.RequestException:
-                        continue
-                
-                time.sleep(0.5)  # Rate limiting
+                for station in search_results:
+                    station_id = station.get('id') or station.get('stationId')
+                    if station_id and station_id not in stations_by_id:
+                        stations_by_id[station_id] = self._normalize_station_data(station)
                 
+                if search_results:
+                    logger.info(f"Found {len(search_results)} stations for '{term}'")
+                    
             except Exception as e:
                 logger.debug(f"Error searching for '{term}': {e}")
                 continue
         
-        logger.info(f"Total unique stations found: {len(stations)}")
-        return stations
+        logger.info(f"Total unique stations found: {len(stations_by_id)}")
+        return list(stations_by_id.values())
+    
+    def _search_term(self, term: str) -> List[Dict[str, Any]]:
+        """
+        Search results for one term from the first endpoint that returns any
+        """
+        try:
+            logger.info(f"Searching for stations starting with '{term}'...")
+            
+            search_endpoints = [
+                f"{self.base_url}/api/v1/stations/search?q={term}",
+                f"{self.base_url}/api/stations/search?query={term}",
+                f"{self.base_url}/api/search/stations?term={term}"
+            ]
+            
+            for endpoint in search_endpoints:
+                try:
+                    response = self._get_with_retry(endpoint)
+                    if response.status_code == 200:
+                        data = response.json()
+                        
+                        if isinstance(data, list):
+                            search_results = data
+                        elif isinstance(data, dict):
+                            search_results = data.get('stations', data.get('results', data.get('data', [])))
+                        else:
+                            continue
+                        
+                        if search_results:
+                            return search_results
+                            
+                except requests.RequestException:
+                    continue
+                    
+        except Exception as e:
+            logger.debug(f"Error searching for '{term}': {e}")
+        
+        return []
     
     def _normalize_station_data(self, station: Dict[str, Any]) -> Dict[str, Any]:
         """
         Normalize station data to match the format from mav-stations package
         """
-        return {
-            'type': 'station',
-            'id': str(station.get('id', station.get('stationId', ''))),
-            'name': station.get('name', station.get('stationName', '')),
-            'aliasNames': station.get('aliasNames', station.get('aliases', [])),
-            'baseCode': station.get('baseCode', station.get('code', '')),
-            'isInternational': station.get('isInternational', False),
-            'canUseForOfferRequest': station.get('canUseForOfferRequest', True),
-            'canUseForPassengerInformation': station.get('canUseForPassengerInformation', False),
-            'country': station.get('country', 'Hungary'),
-            'countryIso': station.get('countryIso', 'HU'),
-            'isIn108_1': station.get('isIn108_1', station.get('internationalCapable', False)),
-            'transportMode': station.get('transportMode', {
-                'code': 100,
-                'name': 'Rail',
-                'description': 'Rail. Used for intercity or long-distance travel.'
-            }),
-            'coordinates': {
-                'latitude': station.get('latitude', station.get('lat')),
-                'longitude': station.get('longitude', station.get('lon', station.get('lng')))
-            } if station.get('latitude') or station.get('lat') else None,
-            'address': station.get('address', ''),
-            'city': station.get('city', ''),
-            'region': station.get('region', ''),
-            'postalCode': station.get('postalCode', ''),
-            'raw_data': station  # Keep original data for reference
-        }
+        normalized = {}
+        for key, aliases, default in FIELD_SPEC:
+            # First alias present wins (presence, not truthiness, like dict.get)
+            for alias in aliases:
+                if alias in station:
+                    normalized[key] = station[alias]
+                    break
+            else:
+                normalized[key] = default() if callable(default) else default
+        
+        normalized['id'] = str(normalized['id'])
+        if station.get('latitude') or station.get('lat'):
+            normalized['coordinates'] = {
+                key: next((station[alias] for alias in aliases if alias in station), None)
+                for key, aliases in COORD_KEYS
+            }
+        normalized['raw_data'] = station  # Keep original data for reference
+        return normalized
+    
+    def _cached_details(self, station_id: str) -> Optional[Dict[str, Any]]:
+        """Station details from the SQLite cache if younger than details_ttl, else None."""
+        if self.details_ttl <= 0:
+            return None
+        try:
+            with closing(sqlite3.connect(self.cache_path)) as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS details (station_id TEXT PRIMARY KEY, ts INTEGER, body TEXT)")
+                row = conn.execute("SELECT ts, body FROM details WHERE station_id = ?", (str(station_id),)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Details cache unavailable: {e}")
+            return None
+        if row and time.time() - row[0] < self.details_ttl:
+            return json.loads(row[1])
+        return None
+    
+    def _store_details(self, station_id: str, details: Dict[str, Any]):
+        """Record freshly fetched station details in the SQLite cache."""
+        if self.details_ttl <= 0:
+            return
+        try:
+            with closing(sqlite3.connect(self.cache_path)) as conn, conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS details (station_id TEXT PRIMARY KEY, ts INTEGER, body TEXT)")
+                conn.execute("INSERT OR REPLACE INTO details (station_id, ts, body) VALUES (?, ?, ?)",
+                             (str(station_id), int(time.time()), json.dumps(details, ensure_ascii=False)))
+        except sqlite3.Error as e:
+            logger.warning(f"Could not cache details for station {station_id}: {e}")
     
     def fetch_station_details(self, station_id: str) -> Optional[Dict[str, Any]]:
         """
         Fetch detailed information for a specific station
+        (served from the on-disk cache for details_ttl; station metadata changes rarely)
         """
+        cached = self._cached_details(station_id)
+        if cached is not None:
+            return cached
+        
         try:
             detail_endpoints = [
                 f"{self.base_url}/api/v1/stations/{station_id}",
@@ -180,9 +355,12 @@ class MAVStationsFetcher:
             
             for endpoint in detail_endpoints:
                 try:
-                    response = self.session.get(endpoint, timeout=15)
+                    response = self._get_with_retry(endpoint)
                     if response.status_code == 200:
-                        return response.json()
+                        details = response.json()
+                        if details:
+                            self._store_details(station_id, details)
+                        return details
                 except requests.RequestException:
                     continue
             
@@ -192,9 +370,26 @@ class MAVStationsFetcher:
             logger.debug(f"Error fetching details for station {station_id}: {e}")
             return None
     
-    def save_stations_data(self, stations: List[Dict[str, Any]], output_file: str = "mav_stations.json"):
+    def save_stations_ndjson(self, stations: List[Dict[str, Any]], output_file: str = "mav_stations.ndjson"):
+        """
+        Save stations as newline-delimited JSON (one station object per line),
+        so readers can process it line by line without loading the whole array
+        """
+        with open(output_file, 'wb') as f:
+            if ORJSON_AVAILABLE:
+                f.writelines(orjson.dumps(station) + b"\n" for station in stations)
+            else:
+                f.writelines(json.dumps(station, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b"\n"
+                             for station in stations)
+    
+    def save_stations_data(self, stations: List[Dict[str, Any]], output_file: str = "mav_stations.json",
+                           pretty: bool = False):
         """
         Save stations data to JSON file
+        
+        Args:
+            pretty: Indent and sort keys; the default compact form is for machine readers
+                (the summary file is always pretty)
         """
         try:
             output_path = Path(output_file)
@@ -202,9 +397,10 @@ class MAVStationsFetcher:
             # Create directory if it doesn't exist
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Save with pretty formatting
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(stations, f, ensure_ascii=False, indent=2, sort_keys=True)
+            _write_json(output_path, stations, sort_keys=pretty, pretty=pretty)
+            
+            # One station per line for streaming readers
+            self.save_stations_ndjson(stations, output_path.with_suffix('.ndjson'))
             
             logger.info(f"Successfully saved {len(stations)} stations to {output_path}")
             
@@ -218,8 +414,7 @@ class MAVStationsFetcher:
             }
             
             summary_path = output_path.parent / f"{output_path.stem}_summary.json"
-            with open(summary_path, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, ensure_ascii=False, indent=2)
+            _write_json(summary_path, summary)
             
             logger.info(f"Summary saved to {summary_path}")
             
@@ -242,17 +437,22 @@ class MAVStationsFetcher:
         # Optionally fetch detailed information for each station
         if include_details:
             logger.info("Fetching detailed information for each station...")
-            for i, station in enumerate(stations):
-                station_id = station.get('id')
-                if station_id:
-                    details = self.fetch_station_details(station_id)
-                    if details:
-                        station.update(details)
-                
-                # Progress update and rate limiting
-                if (i + 1) % 10 == 0:
-                    logger.info(f"Processed {i + 1}/{len(stations)} stations...")
-                time.sleep(0.2)
+            # Fan the lookups out over DETAIL_WORKERS threads (which also bounds the
+            # request rate; _get_with_retry backs off on 429s) and apply them in order
+            with ThreadPoolExecutor(max_workers=DETAIL_WORKERS) as executor:
+                futures = [
+                    executor.submit(self.fetch_station_details, station.get('id')) if station.get('id') else None
+                    for station in stations
+                ]
+                for i, (station, future) in enumerate(zip(stations, futures)):
+                    if future is not None:
+                        details = future.result()
+                        if details:
+                            station.update(details)
+                    
+                    # Progress update
+                    if (i + 1) % 10 == 0:
+                        logger.info(f"Processed {i + 1}/{len(stations)} stations...")
         
         # Save data
         self.save_stations_data(stations, output_file)
@@ -7,12 +7,54 @@ Loads stations from comprehensive_mav_stations.json and plots them on an interac
 import json
 from pathlib import Path
 import folium
+from folium.plugins import FastMarkerCluster
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# (min_lat, max_lat, min_lon, max_lon) around Hungary; stations outside it are
+# mis-tagged or cross-border and would only pull the map view off-center
+HUNGARY_BBOX = (45.7, 48.6, 16.1, 22.9)
+
+# Builds each station marker client-side from a [lat, lon, color, icon, popup, name]
+# row, so the page carries one data array instead of a Leaflet object per station
+MARKER_CALLBACK = """
+function (row) {
+    var icon = L.AwesomeMarkers.icon({icon: row[3], markerColor: row[2], prefix: 'fa'});
+    return L.marker(new L.LatLng(row[0], row[1]), {icon: icon})
+        .bindPopup(row[4], {maxWidth: 300})
+        .bindTooltip(row[5]);
+}
+"""
+
+# Popup and legend markup, formatted per station / per map with str.format
+POPUP_TEMPLATE = """
+            <div style="width: 250px;">
+                <h4>{name}</h4>
+                <p><strong>City:</strong> {city}</p>
+                <p><strong>Operator:</strong> {operator}</p>
+                <p><strong>International:</strong> {international}</p>
+                <p><strong>Major Hub:</strong> {hub}</p>
+                <p><strong>Source:</strong> {source}</p>
+                <p><strong>Coordinates:</strong> {lat:.4f}, {lon:.4f}</p>
+            </div>
+            """
+
+LEGEND_TEMPLATE = '''
+        <div style="position: fixed; 
+                    bottom: 50px; right: 50px; width: 200px; height: 120px; 
+                    background-color: white; border:2px solid grey; z-index:9999; 
+                    font-size:14px; padding: 10px;">
+        <h4>Station Types</h4>
+        <p><i class="fa fa-star" style="color:green"></i> Major Hubs ({major_hubs})</p>
+        <p><i class="fa fa-train" style="color:red"></i> International ({international})</p>
+        <p><i class="fa fa-circle" style="color:blue"></i> Domestic ({domestic})</p>
+        <p><strong>Total: {total} stations</strong></p>
+        </div>
+        '''
+
 def plot_mav_stations(json_file: str = "comprehensive_mav_stations.json", output_html: str = "mav_stations_map.html"):
     """
     Plot MAV stations on an interactive map of Hungary
@@ -29,15 +71,22 @@ def plot_mav_stations(json_file: str = "comprehensive_mav_stations.json", output
         
         logger.info(f"Loaded {len(stations)} stations from {json_path}")
         
-        # Filter stations with valid coordinates
+        # Filter stations with valid coordinates inside Hungary
+        min_lat, max_lat, min_lon, max_lon = HUNGARY_BBOX
         valid_stations = []
+        outside_count = 0
         for station in stations:
             coords = station.get('coordinates')
             if coords and coords.get('latitude') and coords.get('longitude'):
+                lat = float(coords['latitude'])
+                lon = float(coords['longitude'])
+                if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+                    outside_count += 1
+                    continue
                 valid_stations.append({
                     'name': station.get('name', 'Unknown'),
-                    'lat': float(coords['latitude']),
-                    'lon': float(coords['longitude']),
+                    'lat': lat,
+                    'lon': lon,
                     'city': station.get('city', ''),
                     'source': station.get('source', ''),
                     'is_international': station.get('isInternational', False),
@@ -50,6 +99,8 @@ def plot_mav_stations(json_file: str = "comprehensive_mav_stations.json", output
             return False
         
         logger.info(f"Found {len(valid_stations)} stations with valid coordinates")
+        if outside_count:
+            logger.info(f"Skipped {outside_count} stations outside the Hungary bounding box")
         
         # Create interactive map centered on Hungary
         # Hungary center: approx lat 47.1625, lon 19.5033
@@ -67,6 +118,7 @@ def plot_mav_stations(json_file: str = "comprehensive_mav_stations.json", output
         # Add markers for each station
         international_count = 0
         major_hub_count = 0
+        marker_rows = []
         
         for station in valid_stations:
             # Determine marker color and size based on station type
@@ -82,40 +134,29 @@ def plot_mav_stations(json_file: str = "comprehensive_mav_stations.json", output
                 color = 'blue'
                 icon = 'circle'
             
-            marker_icon = folium.Icon(color=color, icon=icon, prefix='fa')
+            popup_text = POPUP_TEMPLATE.format(
+                international='Yes' if station['is_international'] else 'No',
+                hub='Yes' if station['major_hub'] else 'No',
+                **station
+            )
             
-            popup_text = f"""
-            <div style="width: 250px;">
-                <h4>{station['name']}</h4>
-                <p><strong>City:</strong> {station['city']}</p>
-                <p><strong>Operator:</strong> {station['operator']}</p>
-                <p><strong>International:</strong> {'Yes' if station['is_international'] else 'No'}</p>
-                <p><strong>Major Hub:</strong> {'Yes' if station['major_hub'] else 'No'}</p>
-                <p><strong>Source:</strong> {station['source']}</p>
-                <p><strong>Coordinates:</strong> {station['lat']:.4f}, {station['lon']:.4f}</p>
-            </div>
-            """
-            
-            folium.Marker(
-                location=[station['lat'], station['lon']],
-                popup=folium.Popup(popup_text, max_width=300),
-                tooltip=station['name'],
-                icon=marker_icon
-            ).add_to(m)
+            marker_rows.append([station['lat'], station['lon'], color, icon, popup_text, station['name']])
+        
+        # Clustered when zoomed out; individual markers from zoom 10 in
+        FastMarkerCluster(
+            data=marker_rows,
+            callback=MARKER_CALLBACK,
+            name='Stations',
+            options={'disableClusteringAtZoom': 10}
+        ).add_to(m)
         
         # Add legend
-        legend_html = f'''
-        <div style="position: fixed; 
-                    bottom: 50px; right: 50px; width: 200px; height: 120px; 
-                    background-color: white; border:2px solid grey; z-index:9999; 
-                    font-size:14px; padding: 10px;">
-        <h4>Station Types</h4>
-        <p><i class="fa fa-star" style="color:green"></i> Major Hubs ({major_hub_count})</p>
-        <p><i class="fa fa-train" style="color:red"></i> International ({international_count})</p>
-        <p><i class="fa fa-circle" style="color:blue"></i> Domestic ({len(valid_stations) - international_count - major_hub_count})</p>
-        <p><strong>Total: {len(valid_stations)} stations</strong></p>
-        </div>
-        '''
+        legend_html = LEGEND_TEMPLATE.format(
+            major_hubs=major_hub_count,
+            international=international_count,
+            domestic=len(valid_stations) - international_count - major_hub_count,
+            total=len(valid_stations)
+        )
         m.get_root().html.add_child(folium.Element(legend_html))
         
         # Save the map
@@ -1,6 +1,28 @@
 import requests, json, pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 url = "https://jegy-a.mav.hu/IK_API_PROD/api/OfferRequestAPI/GetStationList"
-stations = requests.post(url, json={}, timeout=60).json()
-with open("stations.json", "w", encoding="utf-8") as f:
-    json.dump(stations, f, ensure_ascii=False, indent=4)
+
+# Retry transient MAV errors with backoff; GetStationList is a read despite being a POST.
+# read=0: a read timeout already cost the full 60 s, so don't repeat it
+session = requests.Session()
+retry = Retry(total=5, read=0, backoff_factor=1.0, status_forcelist=[429, 500, 502, 503, 504],
+              allowed_methods=["POST"])
+session.mount("https://", HTTPAdapter(max_retries=retry))
+
+# (connect, read): a stuck connect fails fast instead of burning the full read timeout
+stations = session.post(url, json={}, timeout=(5, 60)).json()
+
+# orjson encodes straight to UTF-8 bytes; both paths write the same 2-space layout
+if orjson is not None:
+    with open("stations.json", "wb") as f:
+        f.write(orjson.dumps(stations, option=orjson.OPT_INDENT_2))
+else:
+    with open("stations.json", "w", encoding="utf-8") as f:
+        json.dump(stations, f, ensure_ascii=False, indent=2)